@@ -0,0 +1,268 @@
+import os
+import re
+import json
+import time
+import hashlib
+import argparse
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import dataloader as dl
+import signal_store as ss
+import filters
+import clock
+import metrics
+
+# 세션 파일 이름 패턴. {session}은 세션 ID, *는 임의의 문자열과 일치
+DEFAULT_MANIFEST = {
+    'reference': 'ECG',
+    'targets': ['PPG', 'GSR'],
+    'files': {
+        'ECG': '{session}_E_Session*_Calibrated_SD.csv',
+        'GSR': '{session}_GP_Session*_Calibrated_SD.csv',
+        'PPG': '{session}_GP_Session*_Calibrated_SD.csv',
+        'EEG': '{session}_EEG*.csv',
+        'VIDEO': '{session}_V.avi',
+        'VIDEO_TIMESTAMP': '{session}_V.csv',
+    },
+    'interpolate_range': None,
+    'sidecar': False,
+    'output_format': 'csv',  # 'csv' 또는 'sig' (signal_store 바이너리 컬럼 저장소)
+    'prefilter': False,  # True이면 동기화 전에 filters.MODALITY_FILTERS 필터 체인 적용
+    'clock_correction': None,  # dict이면 clock.estimate_clock 인자로 대상별 시계 차이를 추정해 보정 (예: {"rectify": true})
+}
+
+def load_manifest(manifest_path=None):
+    """
+    매니페스트(JSON)를 로드합니다. 지정하지 않은 항목은 DEFAULT_MANIFEST 값을 사용합니다.
+
+    :param manifest_path: 매니페스트 JSON 파일 경로 (None이면 기본값).
+    :return: 매니페스트 dict.
+    """
+    manifest = json.loads(json.dumps(DEFAULT_MANIFEST))
+    if manifest_path is not None:
+        with open(manifest_path, 'r', encoding='utf-8') as file:
+            user_manifest = json.load(file)
+        manifest['files'].update(user_manifest.pop('files', {}))
+        manifest.update(user_manifest)
+    return manifest
+
+def pattern_to_regex(pattern):
+    """
+    '{session}'과 '*'를 포함한 파일 이름 패턴을 정규식으로 변환합니다.
+    """
+    regex = ''
+    for part in re.split(r'(\{session\}|\*)', pattern):
+        if part == '{session}':
+            regex += '(?P<session>.+?)'
+        elif part == '*':
+            regex += '.*'
+        else:
+            regex += re.escape(part)
+    return re.compile(regex + '$')
+
+def discover_sessions(recordings_root, manifest):
+    """
+    recordings_root 아래의 파일을 매니페스트 패턴으로 묶어 세션 목록을 만듭니다.
+    기준 신호와 모든 대상 신호 파일이 있는 세션만 반환합니다.
+
+    :param recordings_root: 기록 파일이 있는 최상위 디렉토리.
+    :param manifest: 매니페스트 dict.
+    :return: 세션 dict 리스트 ({'id', 'directory', 'session', 'files'}).
+    """
+    patterns = {modality: pattern_to_regex(pattern) for modality, pattern in manifest['files'].items()}
+    required = [manifest['reference']] + list(manifest['targets'])
+    if manifest['reference'] == 'VIDEO':
+        required.append('VIDEO_TIMESTAMP')
+
+    found = {}
+    for directory, _, file_names in os.walk(recordings_root):
+        for file_name in sorted(file_names):
+            for modality, regex in patterns.items():
+                match = regex.match(file_name)
+                if match:
+                    key = (directory, match.group('session'))
+                    found.setdefault(key, {}).setdefault(modality, file_name)
+
+    sessions = []
+    for (directory, session), files in sorted(found.items()):
+        if all(modality in files for modality in required):
+            relative = os.path.relpath(directory, recordings_root)
+            session_id = session if relative == '.' else os.path.join(relative, session)
+            sessions.append({'id': session_id, 'directory': directory, 'session': session, 'files': files})
+    return sessions
+
+def session_outputs(session, manifest, output_root):
+    """
+    세션의 출력 파일 경로 dict (대상 모달리티 -> 경로).
+    """
+    output_dir = os.path.join(output_root, session['id'])
+    reference = manifest['reference']
+    extension = ss.STORE_SUFFIX if manifest.get('output_format') == 'sig' else '.csv'
+    return {target: os.path.join(output_dir, f'interp_{target}_2_{reference}{extension}') for target in manifest['targets']}
+
+def manifest_hash(manifest):
+    """
+    출력에 영향을 주는 매니페스트 항목(sidecar 제외)의 해시. 세션 기록에 저장해 파이프라인 설정 변경을 감지합니다.
+    """
+    effective = {key: value for key, value in manifest.items() if key != 'sidecar'}
+    return hashlib.sha256(json.dumps(effective, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+def is_up_to_date(session, manifest, output_root, last_run=None):
+    """
+    마지막으로 성공한 처리가 같은 매니페스트로 실행되었고, 모든 출력 파일이 존재하며 입력 파일보다 최신이면 True.
+
+    :param last_run: batch_summary.json에 기록된 이 세션의 마지막 처리 기록 (없으면 다시 처리).
+    """
+    if last_run is None or last_run.get('status') != 'ok' or last_run.get('manifest_hash') != manifest_hash(manifest):
+        return False
+    outputs = list(session_outputs(session, manifest, output_root).values())
+    # 바이너리 저장소는 마지막에 기록되는 meta.json으로 완료 여부를 판단
+    outputs = [os.path.join(path, ss.META_FILE) if ss.is_signal_store(path) else path for path in outputs]
+    if not all(os.path.exists(path) for path in outputs):
+        return False
+    newest_input = max(os.path.getmtime(os.path.join(session['directory'], name)) for name in session['files'].values())
+    return min(os.path.getmtime(path) for path in outputs) >= newest_input
+
+def process_session(session, manifest, output_root):
+    """
+    한 세션에 대해 로드 -> 파싱 -> 동기화 -> 저장을 수행하고 단계별 소요 시간을 반환합니다.
+    프로세스 풀 워커에서 실행되며, 예외는 상태 dict로 반환합니다.
+    'stages'에는 metrics 레지스트리에 모인 세부 단계(parse, range_select, resample, write 등)의 요약이 들어갑니다.
+    """
+    status = {'session': session['id'], 'status': 'ok', 'timings': {}, 'manifest_hash': manifest_hash(manifest)}
+    metrics.REGISTRY.reset()  # 워커 프로세스는 여러 세션을 처리하므로 세션마다 초기화
+    try:
+        started = time.perf_counter()
+        loader = dl.DataLoader(session['directory'], sidecar=manifest.get('sidecar', False))
+        reference_modality = manifest['reference']
+        files = session['files']
+        if reference_modality == 'VIDEO':
+            reference = dl.Data('VIDEO', files['VIDEO'], files['VIDEO_TIMESTAMP'], loader=loader)
+        else:
+            reference = dl.Data(reference_modality, files[reference_modality], loader=loader)
+        targets = [dl.Data(target, files[target], loader=loader) for target in manifest['targets']]
+        status['timings']['load'] = time.perf_counter() - started
+
+        if manifest.get('clock_correction') is not None:
+            started = time.perf_counter()
+            status['clock'] = {}
+            for index, target in enumerate(targets):
+                try:
+                    model = clock.estimate_clock(reference, target, **manifest['clock_correction'])
+                except ValueError as e:
+                    # 상관이 부족한 대상은 보정하지 않고 원래 타임스탬프를 사용
+                    status['clock'][str(target)] = {'error': str(e)}
+                    continue
+                targets[index] = clock.apply_clock(target, model)
+                status['clock'][str(target)] = model.to_dict()
+            status['timings']['clock'] = time.perf_counter() - started
+
+        if manifest.get('prefilter', False):
+            started = time.perf_counter()
+            targets = [filters.prefilter(target) for target in targets]
+            status['timings']['filter'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        interpolate_range = manifest.get('interpolate_range')
+        if interpolate_range is None:
+            interpolate_range = [reference.time_index.values[0], reference.time_index.values[-1]]
+        session_sync = dl.SyncSession(reference=reference, targets=targets, interpolate_range=interpolate_range)
+        result = session_sync.run()
+        status['timings']['sync'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        outputs = session_outputs(session, manifest, output_root)
+        if manifest.get('output_format') == 'sig':
+            session_sync.write(os.path.dirname(next(iter(outputs.values()))), result=result)
+        else:
+            for target in targets:
+                output_path = outputs[str(target)]
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                # 임시 파일에 쓴 뒤 교체하므로, 중간에 실패한 CSV가 최신 출력으로 취급되지 않음
+                temp_path = output_path + '.tmp'
+                result[target.column].to_csv(temp_path, index=True, encoding='utf-8')
+                os.replace(temp_path, output_path)
+        status['timings']['write'] = time.perf_counter() - started
+        status['rows'] = len(result)
+    except Exception as e:
+        status['status'] = 'failed'
+        status['error'] = f"{type(e).__name__}: {e}"
+        status['traceback'] = traceback.format_exc()
+    status['stages'] = metrics.REGISTRY.summary()
+    return status
+
+def load_summary(summary_path):
+    """
+    이전 실행의 batch_summary.json을 읽어 세션 id -> 상태 dict로 반환합니다 (없거나 손상되면 빈 dict).
+    """
+    if not os.path.exists(summary_path):
+        return {}
+    try:
+        with open(summary_path, 'r', encoding='utf-8') as file:
+            sessions = json.load(file).get('sessions', [])
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable batch summary {summary_path}: {e}")
+        return {}
+    return {status['session']: status for status in sessions}
+
+def run_batch(recordings_root, output_root, manifest=None, workers=None, force=False):
+    """
+    recordings_root 아래의 모든 세션을 프로세스 풀에서 동기화하고, 세션별 상태와 소요 시간을
+    output_root/batch_summary.json에 기록합니다. 같은 매니페스트로 처리되었고 출력이 입력보다 최신인 세션은 건너뜁니다.
+    기존 요약이 있으면 이번 실행의 세션 기록으로 갱신하며, 건너뛴 세션은 'skipped' 상태와 함께
+    마지막으로 처리된 기록을 'last_run'에 보존합니다.
+
+    :param recordings_root: 기록 파일이 있는 최상위 디렉토리.
+    :param output_root: 결과를 저장할 최상위 디렉토리.
+    :param manifest: 매니페스트 dict (None이면 DEFAULT_MANIFEST).
+    :param workers: 프로세스 수 (None이면 CPU 코어 수).
+    :param force: True이면 최신 출력이 있어도 다시 처리.
+    :return: 세션별 상태 dict 리스트.
+    """
+    manifest = manifest if manifest is not None else load_manifest()
+    sessions = discover_sessions(recordings_root, manifest)
+    os.makedirs(output_root, exist_ok=True)
+
+    summary_path = os.path.join(output_root, 'batch_summary.json')
+    previous = load_summary(summary_path)
+
+    summary = []
+    pending = []
+    for session in sessions:
+        last_run = previous.get(session['id'])
+        if last_run is not None and last_run['status'] == 'skipped':
+            last_run = last_run.get('last_run')
+        if not force and is_up_to_date(session, manifest, output_root, last_run):
+            summary.append({'session': session['id'], 'status': 'skipped', 'timings': {}, 'last_run': last_run})
+        else:
+            pending.append(session)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(process_session, session, manifest, output_root) for session in pending]
+        for future in as_completed(futures):
+            status = future.result()
+            print(f"[{status['status']}] {status['session']}")
+            summary.append(status)
+
+    elapsed = time.perf_counter() - started
+    previous.update({status['session']: status for status in summary})
+    summary.sort(key=lambda status: status['session'])
+    temp_path = summary_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump({'elapsed': elapsed, 'sessions': sorted(previous.values(), key=lambda status: status['session'])},
+                  file, indent=2, ensure_ascii=False)
+    os.replace(temp_path, summary_path)
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Synchronize every session under a recordings directory.')
+    parser.add_argument('recordings_root', nargs='?', default='./recordings')
+    parser.add_argument('output_root', nargs='?', default='./interpolated_signals')
+    parser.add_argument('--manifest', default=None, help='JSON manifest with file name patterns.')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--force', action='store_true', help='Reprocess sessions whose outputs are up to date.')
+    args = parser.parse_args()
+
+    run_batch(args.recordings_root, args.output_root, load_manifest(args.manifest), args.workers, args.force)
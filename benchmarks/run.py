@@ -0,0 +1,194 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import scipy
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dataloader as dl
+import sync as sc
+import validation
+from vidcap import FrameWriter
+from benchmarks import synthetic
+
+def measure(func, repeat=3):
+    """
+    함수를 repeat번 실행한 소요 시간과, 추가로 한 번 실행해 측정한 최대 메모리 사용량.
+    tracemalloc은 실행 속도를 늦추므로 시간 측정과 분리해 실행합니다.
+
+    :return: (측정 결과 dict, 마지막 실행 결과).
+    """
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'min': min(seconds),
+        'median': float(np.median(seconds)),
+        'repeat': repeat,
+        'peak_mb': peak / 1024 ** 2,
+    }, result
+
+def bench_session(directory, duration, args):
+    """
+    duration초 길이의 합성 세션을 만들고 각 단계의 시간과 메모리를 측정합니다.
+    """
+    files = synthetic.make_session(directory, duration, ecg_rate=args.ecg_rate, gp_rate=args.gp_rate,
+                                   video_fps=args.video_fps, jitter=args.jitter,
+                                   dropouts=[(duration * 0.5, args.dropout)] if args.dropout else [],
+                                   video_size=tuple(args.video_size))
+    results = {}
+    loader = dl.DataLoader(directory)
+
+    def load():
+        # 파싱 캐시를 비워 매번 CSV를 새로 파싱하도록 함
+        dl.PARSE_CACHE.clear()
+        return dl.Data('ECG', files['ECG'], loader=loader), dl.Data('PPG', files['GP'], loader=loader)
+    results['load'], (ecg, ppg) = measure(load, args.repeat)
+    results['load']['rows'] = len(ecg.timestamp) + len(ppg.timestamp)
+
+    interpolate_range = (float(ecg.time_index.values[0]) + 1.0, float(ecg.time_index.values[-1]) - 1.0)
+    def interpolate():
+        dl._resampler_cache.clear()
+        result = dl.interpolate(ecg, ppg, interpolate_range)
+        if isinstance(result, str):
+            raise RuntimeError(result)
+        return result
+    results['interpolate'], interpolated = measure(interpolate, args.repeat)
+    results['interpolate']['rows'] = len(interpolated)
+
+    video = dl.Data('VIDEO', files['VIDEO'], files['VIDEO_TIMESTAMP'], loader=loader)
+    video_timestamps = video.time_index.values
+    frames = np.stack(list(video.frames))  # 디코딩 시간은 제외하고 보간만 측정
+    video.frames.close()
+    total_samples = int((video_timestamps[-1] - video_timestamps[0]) * args.video_rate)
+    out = np.lib.format.open_memmap(os.path.join(directory, 'interpolated.npy'), mode='w+', dtype=np.uint8,
+                                    shape=(total_samples,) + frames.shape[1:])
+    results['interpolate_video'], (interpolated_timestamps, interpolated_frames) = measure(
+        lambda: sc.interpolate_video(video_timestamps, frames, args.video_rate, out=out), args.repeat)
+    results['interpolate_video']['frames'] = total_samples
+
+    def interpolate_video_stream():
+        # 전체 배열 없이 보간 묶음을 바로 인코딩 스레드로 넘김
+        with FrameWriter(os.path.join(directory, 'interpolated.avi'), os.path.join(directory, 'interpolated.csv'),
+                         fps=args.video_rate) as writer:
+            sc.interpolate_video(video_timestamps, frames, args.video_rate, writer=writer)
+        return writer.count
+    results['interpolate_video_stream'], written = measure(interpolate_video_stream, args.repeat)
+    results['interpolate_video_stream']['frames'] = written
+
+    results['synchronize_nearest_frames'], synchronized = measure(
+        lambda: validation.synchronize_nearest_frames(frames, video_timestamps, interpolated_frames,
+                                                      interpolated_timestamps), args.repeat)
+    results['synchronize_nearest_frames']['frames'] = len(synchronized)
+
+    results['calculate_psnr'], psnr = measure(
+        lambda: validation.calculate_psnr(frames, synchronized), args.repeat)
+    results['calculate_psnr']['psnr'] = float(psnr)
+    del out, interpolated_frames
+    return results
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scipy': scipy.__version__,
+        'opencv': cv2.__version__,
+    }
+
+def compare(current, previous, threshold=1.2, min_seconds=0.01):
+    """
+    이전 결과와 비교해 최소 시간이 threshold배 이상 늘어난 항목을 찾습니다.
+    잡음이 큰 아주 짧은 단계(두 결과 모두 min_seconds 미만)는 회귀로 판단하지 않습니다.
+
+    :return: 회귀 항목 리스트 [(길이, 단계, 이전 초, 현재 초, 비율), ...].
+    """
+    regressions = []
+    for duration, stages in current['results'].items():
+        for stage, result in stages.items():
+            old = previous['results'].get(duration, {}).get(stage)
+            if old is None:
+                continue
+            ratio = result['min'] / old['min'] if old['min'] > 0 else np.inf
+            print(f"{duration:>8}s {stage:<28} {old['min']:9.4f}s -> {result['min']:9.4f}s  x{ratio:5.2f}"
+                  f"  peak {old['peak_mb']:8.1f} -> {result['peak_mb']:8.1f} MB")
+            if ratio >= threshold and max(old['min'], result['min']) >= min_seconds:
+                regressions.append((duration, stage, old['min'], result['min'], ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='합성 데이터로 파싱, 보간, 비디오 보간, 정렬, PSNR 단계의 성능을 측정합니다.')
+    parser.add_argument('--durations', type=float, nargs='+', default=[10, 60, 300], help='세션 길이 (초)')
+    parser.add_argument('--ecg-rate', type=float, default=500)
+    parser.add_argument('--gp-rate', type=float, default=128)
+    parser.add_argument('--video-fps', type=float, default=30)
+    parser.add_argument('--video-rate', type=float, default=500, help='비디오 보간 샘플링 레이트 (Hz)')
+    parser.add_argument('--video-size', type=int, nargs=2, default=[64, 48], metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--jitter', type=float, default=0.0005, help='타임스탬프 지터 표준편차 (초)')
+    parser.add_argument('--dropout', type=float, default=0.5, help='세션 중간의 누락 구간 길이 (초, 0이면 없음)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='결과 JSON 경로 (기본: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', default=None, help='비교할 이전 결과 JSON 경로')
+    parser.add_argument('--threshold', type=float, default=1.2, help='회귀로 판단할 시간 비율')
+    parser.add_argument('--min-seconds', type=float, default=0.01, help='이보다 짧은 단계는 회귀 판단에서 제외')
+    parser.add_argument('--workdir', default=None, help='합성 데이터 디렉토리 (기본: 임시 디렉토리, 실행 후 삭제)')
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='sync_bench_')
+    report = {'environment': environment(), 'config': vars(args), 'results': {}}
+    try:
+        for duration in args.durations:
+            print(f"Benchmarking {duration:g}s session...")
+            directory = os.path.join(workdir, f'{duration:g}s')
+            report['results'][f'{duration:g}'] = bench_session(directory, duration, args)
+            for stage, result in report['results'][f'{duration:g}'].items():
+                print(f"  {stage:<28} median {result['median']:9.4f}s  peak {result['peak_mb']:8.1f} MB")
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results',
+                                         f"{(report['environment']['commit'] or 'local')[:10]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            previous = json.load(file)
+        print(f"Comparing with {args.compare} (commit {previous['environment'].get('commit')})")
+        regressions = compare(report, previous, args.threshold, args.min_seconds)
+        if regressions:
+            print(f"Warning: {len(regressions)} stage(s) slower than x{args.threshold:g}")
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,109 @@
+import os
+import numpy as np
+import pandas as pd
+import cv2
+
+# Shimmer 내보내기와 같은 컬럼 구성 (장치 ID, 컬럼 이름, 단위)
+ECG_DEVICE = ('id820D', [
+    ('Timestamp_Unix_CAL', 'ms'),
+    ('ECG_EMG_Status1_CAL', 'no_units'),
+    ('ECG_EMG_Status2_CAL', 'no_units'),
+    ('ECG_LA-RA_24BIT_CAL', 'mV'),
+    ('ECG_LL-LA_24BIT_CAL', 'mV'),
+    ('ECG_LL-RA_24BIT_CAL', 'mV'),
+    ('ECG_Vx-RL_24BIT_CAL', 'mV'),
+])
+GP_DEVICE = ('id95AE', [
+    ('Timestamp_Unix_CAL', 'ms'),
+    ('GSR_Range_CAL', 'no_units'),
+    ('GSR_Skin_Conductance_CAL', 'uS'),
+    ('GSR_Skin_Resistance_CAL', 'kOhms'),
+    ('PPG_A13_CAL', 'mV'),
+])
+
+def synthetic_timestamps(start_time, duration, rate, jitter=0.0, dropouts=(), seed=0):
+    """
+    균일한 샘플링에 지터와 누락 구간을 더한 타임스탬프 (초).
+
+    :param start_time: 시작 Unix 시간 (초).
+    :param duration: 기록 길이 (초).
+    :param rate: 샘플링 레이트 (Hz).
+    :param jitter: 샘플 시점 지터의 표준편차 (초).
+    :param dropouts: 누락 구간 리스트 [(시작 오프셋 초, 길이 초), ...].
+    :param seed: 난수 시드.
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = start_time + np.arange(int(duration * rate)) / rate
+    if jitter:
+        # 순서가 바뀌지 않도록 지터는 샘플 간격의 1/4로 제한
+        timestamps += np.clip(rng.normal(0, jitter, len(timestamps)), -0.25 / rate, 0.25 / rate)
+    keep = np.ones(len(timestamps), dtype=bool)
+    for offset, length in dropouts:
+        keep &= ~((timestamps >= start_time + offset) & (timestamps < start_time + offset + length))
+    return timestamps[keep]
+
+def write_shimmer_csv(path, device, timestamps, seed=0):
+    """
+    Shimmer 내보내기 형식('sep=' 줄, 헤더 줄, 단위 줄, 줄 끝 구분자 포함)의 합성 CSV를 저장합니다.
+    """
+    rng = np.random.default_rng(seed)
+    device_id, columns = device
+    elapsed = timestamps - timestamps[0]
+    frame = {f'{device_id}_Timestamp_Unix_CAL': np.round(timestamps * 1000.0, 2)}
+    for index, (name, _) in enumerate(columns[1:]):
+        if name.endswith(('Status1_CAL', 'Status2_CAL', 'Range_CAL')):
+            signal = np.zeros(len(timestamps))
+        else:
+            # 채널마다 주파수가 다른 사인파 + 잡음
+            signal = 100 * np.sin(2 * np.pi * (0.5 + index) * elapsed) + rng.normal(0, 1, len(timestamps))
+        frame[f'{device_id}_{name}'] = signal
+    frame = pd.DataFrame(frame)
+    frame[''] = ''  # 줄 끝의 구분자
+
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        file.write('"sep=\t"\n')
+        file.write('\t'.join(f'{device_id}_{name}' for name, _ in columns) + '\t\n')
+        file.write('\t'.join(unit for _, unit in columns) + '\t\n')
+        frame.to_csv(file, sep='\t', header=False, index=False, lineterminator='\n')
+    return path
+
+def write_synthetic_video(video_path, timestamp_path, timestamps, size=(64, 48), fps=30):
+    """
+    움직이는 그라디언트로 된 작은 합성 AVI와 VideoLoader가 읽는 타임스탬프 CSV를 저장합니다.
+    """
+    width, height = size
+    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'XVID'), fps, size)
+    x = np.arange(width)[None, :]
+    y = np.arange(height)[:, None]
+    for index in range(len(timestamps)):
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[..., 0] = (x + 2 * index) % 256
+        frame[..., 1] = (y + index) % 256
+        frame[..., 2] = (x + y + 3 * index) % 256
+        writer.write(frame)
+    writer.release()
+    pd.DataFrame({'timestamp': timestamps, 'Elapsed Time (s)': timestamps - timestamps[0]}).to_csv(timestamp_path, index=False)
+    return video_path, timestamp_path
+
+def make_session(directory, duration, ecg_rate=500, gp_rate=128, video_fps=30, jitter=0.0, dropouts=(),
+                 video_size=(64, 48), start_time=1736497141.0):
+    """
+    벤치마크용 합성 세션 (ECG, GSR/PPG, 비디오) 파일을 directory에 만듭니다.
+
+    :return: 파일 이름 dict.
+    """
+    os.makedirs(directory, exist_ok=True)
+    files = {
+        'ECG': 'SYN_E_Session1_id820D_Calibrated_SD.csv',
+        'GP': 'SYN_GP_Session1_id95AE_Calibrated_SD.csv',
+        'VIDEO': 'SYN_V.avi',
+        'VIDEO_TIMESTAMP': 'SYN_V.csv',
+    }
+    write_shimmer_csv(os.path.join(directory, files['ECG']), ECG_DEVICE,
+                      synthetic_timestamps(start_time, duration, ecg_rate, jitter, dropouts, seed=1), seed=1)
+    write_shimmer_csv(os.path.join(directory, files['GP']), GP_DEVICE,
+                      synthetic_timestamps(start_time, duration, gp_rate, jitter, dropouts, seed=2), seed=2)
+    write_synthetic_video(os.path.join(directory, files['VIDEO']), os.path.join(directory, files['VIDEO_TIMESTAMP']),
+                          synthetic_timestamps(start_time + 0.5, duration - 1, video_fps, jitter=0.002, seed=3),
+                          size=video_size, fps=video_fps)
+    return files
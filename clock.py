@@ -0,0 +1,232 @@
+import copy
+
+import numpy as np
+import pandas as pd
+from scipy.fft import rfft, irfft, next_fast_len
+
+import sync as sc
+import filters
+import metrics
+from dataloader import TimeIndex
+
+class ClockModel:
+    def __init__(self, offset, drift, origin, windows=None):
+        """
+        대상 장치 시계와 기준 장치 시계의 관계: lag(t) = offset + drift * (t - origin).
+        같은 사건이 대상 시계로 t에 기록되었다면 기준 시계로는 t - lag(t)입니다.
+
+        :param offset: origin 시점의 시계 차이 (초, 대상 - 기준).
+        :param drift: 시계 차이의 변화율 (초/초). 1e-6은 1 ppm.
+        :param origin: 기준 시점 (대상 시계, 초).
+        :param windows: 추정에 사용한 창별 결과 DataFrame (선택적).
+        """
+        self.offset = offset
+        self.drift = drift
+        self.origin = origin
+        self.windows = windows
+
+    def lag(self, timestamps):
+        return self.offset + self.drift * (np.asarray(timestamps, dtype=float) - self.origin)
+
+    def correct(self, timestamps):
+        """
+        대상 시계의 타임스탬프를 기준 시계로 변환합니다.
+        """
+        timestamps = np.asarray(timestamps, dtype=float)
+        return timestamps - self.lag(timestamps)
+
+    def to_dict(self):
+        return {'offset': self.offset, 'drift': self.drift, 'origin': self.origin,
+                'windows': int(self.windows['used'].sum()) if self.windows is not None else None}
+
+    def __repr__(self):
+        return f"ClockModel(offset={self.offset * 1000:.3f} ms, drift={self.drift * 1e6:.3f} ppm)"
+
+def feature_signal(timestamps, values, grid, band=(0.5, 5.0), rectify=False):
+    """
+    상관 계산에 쓸 특징 신호를 공통 균일 시간축(grid)에 만듭니다.
+    polyphase 리샘플링(sync.resample_polyphase)으로 안티에일리어싱하며 grid 레이트로 낮춘 뒤,
+    대역 통과 필터로 기저선 변동과 잡음을 제거합니다.
+
+    :param timestamps: 원본 타임스탬프 (초).
+    :param values: (샘플 수,) 또는 (샘플 수, 채널 수) 배열. 여러 채널이면 첫 번째 채널만 사용.
+    :param grid: 공통 균일 시간축 (초).
+    :param band: 대역 통과 범위 (Hz). None이면 필터를 적용하지 않음.
+    :param rectify: True이면 필터링 후 절댓값을 사용 (예: ECG QRS와 PPG 맥파처럼 파형이 다른 경우).
+    :return: grid와 같은 길이의 표준화된 특징 신호.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[:, 0] if values.ndim == 2 else values
+    rate = 1.0 / (grid[1] - grid[0])
+    decimated_t, decimated_v, _ = sc.resample_polyphase(timestamps, values, rate)
+    feature = np.interp(grid, decimated_t, decimated_v)
+    if band is not None:
+        feature = filters.zero_phase(feature, filters.design_sos('bandpass', tuple(band), 2, float(rate)))
+    if rectify:
+        feature = np.abs(feature)
+    return (feature - feature.mean()) / (feature.std() or 1.0)
+
+def _window_lags(reference, target, reference_starts, target_starts, length, span):
+    """
+    창마다 reference[s:s+length]와 target[u:u+length+span]의 정규화 상호상관을 FFT로 한 번에 계산.
+
+    :return: (창별 최대 상관 위치 k (0 <= k <= span, 포물선 보간으로 소수점 포함), 창별 최대 정규화 상관값).
+    """
+    size = next_fast_len(length + span)
+    rows = np.arange(length)
+    reference_windows = reference[reference_starts[:, None] + rows]
+    target_windows = target[target_starts[:, None] + np.arange(length + span)]
+    reference_windows = reference_windows - reference_windows.mean(axis=1, keepdims=True)
+    target_windows = target_windows - target_windows.mean(axis=1, keepdims=True)
+
+    # 원형 상관 c[k] = sum_i r[i] * t[i + k]; k <= span이면 size >= length + span이므로 겹침 없음
+    correlation = irfft(np.conj(rfft(reference_windows, size, axis=1)) * rfft(target_windows, size, axis=1), size, axis=1)
+    correlation = correlation[:, :span + 1]
+
+    # 위치 k마다 target 부분 창의 에너지로 정규화 (누적합 이용)
+    cumulative = np.concatenate([np.zeros((len(target_windows), 1)), np.cumsum(target_windows ** 2, axis=1)], axis=1)
+    target_energy = cumulative[:, length:length + span + 1] - cumulative[:, :span + 1]
+    reference_energy = np.sum(reference_windows ** 2, axis=1, keepdims=True)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = correlation / np.sqrt(reference_energy * target_energy)
+    correlation = np.nan_to_num(correlation, nan=-1.0)
+
+    peaks = np.argmax(correlation, axis=1)
+    scores = correlation[np.arange(len(peaks)), peaks]
+    # 최대값 주변 세 점으로 포물선 보간해 샘플 간격보다 정밀한 위치를 구함
+    inner = (peaks > 0) & (peaks < span)
+    left = correlation[np.arange(len(peaks)), np.maximum(peaks - 1, 0)]
+    right = correlation[np.arange(len(peaks)), np.minimum(peaks + 1, span)]
+    curvature = left - 2 * scores + right
+    with np.errstate(invalid='ignore', divide='ignore'):
+        shift = np.where(inner & (curvature < 0), 0.5 * (left - right) / curvature, 0.0)
+    return peaks + shift, scores
+
+def estimate_lags(reference_timestamps, reference_values, target_timestamps, target_values, window=30.0, step=10.0,
+                  max_lag=1.0, rate=50.0, fine_rate=250.0, band=(0.5, 5.0), rectify=False):
+    """
+    두 신호의 공통 성분을 슬라이딩 창별 FFT 상호상관으로 비교해 창마다 시계 차이(대상 - 기준)를 추정.
+    먼저 rate로 낮춘 신호에서 ±max_lag 전체를 탐색하고, fine_rate 신호에서는 찾은 위치 주변만 다시 탐색합니다.
+
+    :param window: 창 길이 (초).
+    :param step: 창 간격 (초).
+    :param max_lag: 탐색할 최대 시계 차이 (초).
+    :param rate: 전체 탐색에 쓰는 레이트 (Hz).
+    :param fine_rate: 정밀 탐색에 쓰는 레이트 (Hz). None이면 정밀 탐색을 생략.
+    :param band: 특징 신호의 대역 통과 범위 (Hz).
+    :param rectify: 특징 신호에 절댓값을 사용할지 여부.
+    :return: 창별 'time'(창 중심, 대상 시계), 'lag'(초), 'correlation' DataFrame.
+    """
+    reference_timestamps = np.asarray(reference_timestamps, dtype=float)
+    target_timestamps = np.asarray(target_timestamps, dtype=float)
+    start = max(reference_timestamps[0], target_timestamps[0])
+    end = min(reference_timestamps[-1], target_timestamps[-1])
+    if end - start < window + 2 * max_lag:
+        raise ValueError(f"Overlap of {end - start:.1f} s is too short for window={window} s and max_lag={max_lag} s.")
+
+    with metrics.stage('clock_search', rate=rate) as stage:
+        grid = sc.uniform_grid(start, end, rate)
+        reference = feature_signal(reference_timestamps, reference_values, grid, band, rectify)
+        target = feature_signal(target_timestamps, target_values, grid, band, rectify)
+        length, margin = int(round(window * rate)), int(np.ceil(max_lag * rate))
+        reference_starts = np.arange(margin, len(grid) - length - margin + 1, max(1, int(round(step * rate))))
+        peaks, scores = _window_lags(reference, target, reference_starts, reference_starts - margin, length, 2 * margin)
+        lags = (peaks - margin) / rate
+        centers = start + (reference_starts + 0.5 * length) / rate  # 창 중심 (기준 시계)
+        stage.count('windows', len(reference_starts))
+
+    if fine_rate is not None and fine_rate > rate:
+        with metrics.stage('clock_refine', rate=fine_rate) as stage:
+            grid = sc.uniform_grid(start, end, fine_rate)
+            reference = feature_signal(reference_timestamps, reference_values, grid, band, rectify)
+            target = feature_signal(target_timestamps, target_values, grid, band, rectify)
+            length = int(round(window * fine_rate))
+            margin = int(np.ceil(2 * fine_rate / rate))  # 전체 탐색 결과의 ±2 샘플만 다시 탐색
+            fine_starts = np.round(reference_starts * fine_rate / rate).astype(int)
+            shifted = fine_starts + np.round(lags * fine_rate).astype(int)
+            # 탐색 범위가 신호 밖으로 나가는 창은 전체 탐색 결과를 그대로 사용
+            valid = (fine_starts + length <= len(grid)) & (shifted - margin >= 0) & (shifted + length + margin <= len(grid))
+            if valid.any():
+                fine_peaks, fine_scores = _window_lags(reference, target, fine_starts[valid], shifted[valid] - margin,
+                                                       length, 2 * margin)
+                lags[valid] = (shifted[valid] - fine_starts[valid] + fine_peaks - margin) / fine_rate
+                scores[valid] = fine_scores
+            stage.count('windows', int(valid.sum()))
+
+    # 시계 차이는 대상 시계 기준으로 맞추므로 창 중심도 대상 시계로 표시
+    return pd.DataFrame({'time': centers + lags, 'lag': lags, 'correlation': scores})
+
+def fit_clock(windows, min_correlation=0.5, outlier_threshold=3.0):
+    """
+    창별 시계 차이에 offset + 선형 drift를 상관값 가중 최소제곱으로 맞춥니다.
+    중앙값 절대 편차(MAD) 기준으로 벗어난 창은 한 번 제외하고 다시 맞춥니다.
+
+    :param windows: estimate_lags의 결과.
+    :param min_correlation: 사용할 창의 최소 정규화 상관값.
+    :param outlier_threshold: 이상치로 판단할 MAD 배수.
+    :return: ClockModel. windows에 사용 여부 'used' 컬럼이 추가됩니다.
+    """
+    windows = windows.copy()
+    used = windows['correlation'].to_numpy() >= min_correlation
+    times, lags = windows['time'].to_numpy(), windows['lag'].to_numpy()
+    weights = np.clip(windows['correlation'].to_numpy(), 0, None)
+    origin = float(times[0]) if len(times) else 0.0
+
+    for _ in range(2):
+        if used.sum() < 2:
+            raise ValueError(f"Only {int(used.sum())} windows have correlation >= {min_correlation}; cannot fit clock drift.")
+        drift, offset = np.polyfit(times[used] - origin, lags[used], 1, w=weights[used])
+        residuals = lags - (offset + drift * (times - origin))
+        spread = 1.4826 * np.median(np.abs(residuals[used] - np.median(residuals[used])))
+        inliers = np.abs(residuals) <= outlier_threshold * max(spread, 1e-6)
+        if np.all(inliers[used]):
+            break
+        used &= inliers
+
+    windows['used'] = used
+    return ClockModel(float(offset), float(drift), origin, windows)
+
+def estimate_clock(reference, target, column=None, reference_column=None, **kwargs):
+    """
+    두 Data 스트림의 시계 차이(offset + drift)를 추정합니다.
+
+    :param reference: 기준 Data 객체.
+    :param target: 대상 Data 객체.
+    :param column: 대상에서 사용할 컬럼 이름 (None이면 첫 번째 채널).
+    :param reference_column: 기준에서 사용할 컬럼 이름 (None이면 첫 번째 채널).
+    :param kwargs: estimate_lags와 fit_clock의 인자 (window, step, max_lag, rate, fine_rate, band, rectify,
+                   min_correlation, outlier_threshold).
+    :return: ClockModel.
+    """
+    fit_kwargs = {key: kwargs.pop(key) for key in ('min_correlation', 'outlier_threshold') if key in kwargs}
+    with metrics.stage('clock_estimate', target=str(target)):
+        windows = estimate_lags(
+            reference.time_index.values, _channel(reference, reference_column),
+            target.time_index.values, _channel(target, column), **kwargs,
+        )
+        return fit_clock(windows, **fit_kwargs)
+
+def _channel(data, column):
+    if data.values is None:
+        raise ValueError(f"{data} has no signal values; pass a feature signal such as frame_brightness() instead.")
+    return data.values[:, 0] if column is None else data.values[:, data.column.index(column)]
+
+def apply_clock(data, model):
+    """
+    대상 Data의 타임스탬프를 기준 시계로 변환한 복사본을 반환합니다 (값은 복사하지 않음).
+    리샘플링 전에 적용하면 보간 비용 외에 추가 비용이 거의 없습니다.
+    """
+    corrected = copy.copy(data)
+    timestamps = model.correct(data.time_index.values)
+    corrected.timestamp = pd.Series(timestamps)
+    corrected.time_index = TimeIndex(timestamps)
+    return corrected
+
+def frame_brightness(frames):
+    """
+    프레임별 평균 밝기. 비디오의 동기화 플래시를 다른 스트림과 상관시킬 때 특징 신호로 사용합니다.
+
+    :param frames: 프레임 시퀀스 (리스트, 배열 또는 VideoLoader).
+    :return: (프레임 수,) 배열.
+    """
+    return np.array([np.asarray(frame, dtype=np.float32).mean() for frame in frames])
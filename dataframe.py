@@ -2,6 +2,8 @@ import os
 import pandas as pd
 import numpy as np
 
+import metrics
+
 # csv 읽는 함수
 def load_csv(directory, file_name):
     file_path = os.path.join(directory, file_name)
@@ -9,31 +11,85 @@ def load_csv(directory, file_name):
 
 # 데이터 포인트 확인 및 보완 함수
 def check_and_adjust_signals(df, start_time, end_time, sampling_rate):
-    filtered_df = df[(df['timestamp'] >= start_time) & (df['timestamp'] <= end_time)]
+    with metrics.stage('adjust') as stage:
+        filtered_df = df[(df['timestamp'] >= start_time) & (df['timestamp'] <= end_time)]
+
+        required_points = int(sampling_rate * (end_time - start_time)) # 이상적 필요 데이터 포인트 수
+        actual_points = len(filtered_df) # 실제 측정된 데이터 포인트 수
+        stage.count('required_points', required_points)
+        stage.count('actual_points', actual_points)
+
+        if actual_points < required_points: # 데이터 포인트가 부족하면 종료시간 이후에서 가져옴
+            missing_points = required_points - actual_points
+            additional_data = df[df['timestamp'] > end_time].head(missing_points)
+
+            if len(additional_data) < missing_points: # 뒤에서 부족한 만큼 채울 수 없는 경우
+                print("Warning: Not enough additional data to fill missing points.")
+
+            combined_df = pd.concat([filtered_df, additional_data]).sort_values('timestamp')
+            stage.count('added_points', len(additional_data))
+
+        elif actual_points > required_points: # 데이터 포인트가 넘칠 경우 뒤에서부터 삭제
+            excess_points = actual_points - required_points
+            combined_df = filtered_df.iloc[:-excess_points]
+            stage.count('removed_points', excess_points)
 
-    required_points = int(sampling_rate * (end_time - start_time)) # 이상적 필요 데이터 포인트 수
-    actual_points = len(filtered_df) # 실제 측정된 데이터 포인트 수
+        else: # 완벽하게 데이터 포인트가 구성되었다면 그대로 반환
+            combined_df = filtered_df
 
-    print(f"Required Points: {required_points}, Actual Points: {actual_points}")
+        return combined_df
 
-    if actual_points < required_points: # 데이터 포인트가 부족하면 종료시간 이후에서 가져옴
-        missing_points = required_points - actual_points
-        additional_data = df[df['timestamp'] > end_time].head(missing_points)
 
-        if len(additional_data) < missing_points: # 뒤에서 부족한 만큼 채울 수 없는 경우
-            print("Warning: Not enough additional data to fill missing points.")
-        
-        combined_df = pd.concat([filtered_df, additional_data]).sort_values('timestamp')
-        print(f"Added {len(additional_data)} points from additional data.")
+# 여러 구간(epoch)을 한 번에 추출하는 함수
+def extract_epochs(df, start_times, duration, sampling_rate, columns=None):
+    """
+    check_and_adjust_signals와 같은 규칙(부족하면 종료시간 이후에서 채우고, 넘치면 뒤에서부터 삭제)으로
+    여러 구간을 한 번에 잘라 (구간 수, 샘플 수, 채널 수) 배열로 반환.
+    구간 경계는 이진 탐색으로 찾고, 값은 strided view에서 한 번에 모아 복사합니다.
 
-    elif actual_points > required_points: # 데이터 포인트가 넘칠 경우 뒤에서부터 삭제
-        excess_points = actual_points - required_points
-        combined_df = filtered_df.iloc[:-excess_points]
-        print(f"Removed {excess_points} excess points.")
+    :param df: 'timestamp' 컬럼을 포함한 DataFrame.
+    :param start_times: 구간 시작 시간 배열.
+    :param duration: 구간 길이 (초).
+    :param sampling_rate: 샘플링 레이트 (Hz). 구간당 샘플 수는 round(sampling_rate * duration)로 모든 구간에 동일
+                          (end_time - start_time의 부동소수점 오차로 한 샘플씩 달라지지 않도록 반올림).
+    :param columns: 추출할 컬럼 리스트 (None이면 'timestamp'를 제외한 전체).
+    :return: (구간 배열, 구간별 타임스탬프 (구간 수, 샘플 수), 구간별 보완 내역 DataFrame).
+             뒤에서 채울 데이터가 모자란 자리는 NaN.
+    """
+    columns = [column for column in df.columns if column != 'timestamp'] if columns is None else list(columns)
+    timestamps = df['timestamp'].to_numpy(dtype=float)
+    values = df[columns].to_numpy(dtype=float)
+    if np.any(np.diff(timestamps) < 0):
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, values = timestamps[order], values[order]
 
-    else: # 완벽하게 데이터 포인트가 구성되었다면 그대로 반환
-        combined_df = filtered_df
-        print("Data points are correct.")
+    start_times = np.asarray(start_times, dtype=float)
+    required_points = int(round(sampling_rate * duration))  # 이상적 필요 데이터 포인트 수
+    first = np.searchsorted(timestamps, start_times, side='left')
+    last = np.searchsorted(timestamps, start_times + duration, side='right')
+    actual_points = last - first  # 실제 측정된 데이터 포인트 수
 
-    return combined_df
+    # 채우기/삭제 규칙을 적용하면 각 구간은 항상 first부터 연속된 required_points개의 샘플
+    available = np.minimum(required_points, len(timestamps) - first)
+    epochs = np.full((len(start_times), required_points, len(columns)), np.nan)
+    epoch_timestamps = np.full((len(start_times), required_points), np.nan)
+    if required_points > 0 and len(timestamps) >= required_points:
+        complete = np.flatnonzero(available == required_points)
+        value_windows = np.lib.stride_tricks.sliding_window_view(values, required_points, axis=0)
+        time_windows = np.lib.stride_tricks.sliding_window_view(timestamps, required_points)
+        epochs[complete] = value_windows[first[complete]].transpose(0, 2, 1)
+        epoch_timestamps[complete] = time_windows[first[complete]]
+    # 파일 끝에 걸려 샘플이 모자란 구간
+    for i in np.flatnonzero((available < required_points) & (available > 0)):
+        epochs[i, :available[i]] = values[first[i]:first[i] + available[i]]
+        epoch_timestamps[i, :available[i]] = timestamps[first[i]:first[i] + available[i]]
 
+    report = pd.DataFrame({
+        'start_time': start_times,
+        'required': required_points,
+        'actual': actual_points,
+        'padded': np.clip(np.maximum(available, 0) - actual_points, 0, None),
+        'trimmed': np.clip(actual_points - required_points, 0, None),
+        'missing': required_points - np.maximum(available, 0),
+    })
+    return epochs, epoch_timestamps, report
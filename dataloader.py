@@ -1,35 +1,328 @@
 import os
+import contextlib
 import pandas as pd
 import numpy as np
 # import json
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta, timezone
 import json
-# import cv2
+import cv2
 import numpy as np
-# import sync as sc
+import weakref
+import struct
+import sync as sc
+import signal_store as ss
+import metrics
 # import validation as vd
-from scipy.interpolate import interp1d
+from collections import OrderedDict
+from functools import lru_cache
+
+SHIMMER_TIMESTAMP = 'Timestamp_Unix_CAL'
+SHIMMER_CHANNELS = {
+    'ECG': ['ECG_LA-RA_24BIT_CAL', 'ECG_LL-LA_24BIT_CAL', 'ECG_LL-RA_24BIT_CAL', 'ECG_Vx-RL_24BIT_CAL'],
+    'GSR': ['GSR_Skin_Conductance_CAL', 'GSR_Skin_Resistance_CAL'],
+    'PPG': ['PPG_A13_CAL'],
+}
+
+def is_shimmer_csv(file_path):
+    """
+    파일 첫 줄이 Shimmer 내보내기의 'sep=' 지시자인지 확인합니다.
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        first_line = file.readline().rstrip('\r\n').strip('"')
+    return first_line.startswith('sep=')
+
+def read_shimmer_header(file_path):
+    """
+    Shimmer CSV의 앞 세 줄('sep=' 줄, 헤더 줄, 단위 줄)을 읽습니다.
+
+    :param file_path: Shimmer CSV 파일 경로.
+    :return: (구분자, 컬럼 이름 리스트, 단위 리스트).
+    """
+    with open(file_path, 'r', encoding='utf-8') as file:
+        sep = file.readline().rstrip('\r\n').strip('"')[len('sep='):] or '\t'
+        header = file.readline().rstrip('\r\n').split(sep)
+        units = file.readline().rstrip('\r\n').split(sep)
+    # 줄 끝의 구분자로 생기는 빈 컬럼은 제외
+    while header and header[-1] == '':
+        header.pop()
+    units = units[:len(header)] + [''] * (len(header) - len(units))
+    return sep, header, units
+
+def resolve_columns(header, columns):
+    """
+    요청한 컬럼 이름을 실제 헤더 이름으로 변환합니다.
+    정확히 일치하는 이름이 없으면 장치 ID 접두사(예: 'id95AE_')를 무시하고 접미사로 찾습니다.
+
+    :param header: Shimmer CSV 헤더의 컬럼 이름 리스트.
+    :param columns: 찾을 컬럼 이름 또는 접미사 리스트.
+    :return: 헤더에 존재하는 컬럼 이름 리스트.
+    """
+    resolved = []
+    for column in columns:
+        if column in header:
+            resolved.append(column)
+            continue
+        matches = [name for name in header if name.endswith('_' + column)]
+        if len(matches) != 1:
+            raise ValueError(f"Column '{column}' not found (or ambiguous) in header: {header}")
+        resolved.append(matches[0])
+    return resolved
+
+def known_shimmer_columns(header):
+    """
+    헤더에서 타임스탬프와 SHIMMER_CHANNELS에 정의된 채널(모든 모달리티)의 실제 이름을 찾습니다.
+    한 장치 파일을 한 번만 파싱해 여러 모달리티가 공유할 때 읽을 컬럼 목록으로 사용합니다.
+    """
+    suffixes = [SHIMMER_TIMESTAMP] + [channel for channels in SHIMMER_CHANNELS.values() for channel in channels]
+    return [name for name in header if any(name == suffix or name.endswith('_' + suffix) for suffix in suffixes)]
+
+class ShimmerTable:
+    def __init__(self, file_path, arrays, units):
+        """
+        파싱된 Shimmer CSV 컬럼을 NumPy 배열로 보관합니다.
+
+        :param file_path: 원본 CSV 파일 경로.
+        :param arrays: 컬럼 이름 -> 1차원 NumPy 배열 dict.
+        :param units: 컬럼 이름 -> 단위 문자열 dict (메타데이터).
+        """
+        self.file_path = file_path
+        self.arrays = arrays
+        self.units = units
+
+    @property
+    def columns(self):
+        return list(self.arrays)
+
+    def __len__(self):
+        return len(next(iter(self.arrays.values()))) if self.arrays else 0
+
+    def __getitem__(self, column):
+        return self.arrays[resolve_columns(self.columns, [column])[0]]
+
+    def column_name(self, column):
+        return resolve_columns(self.columns, [column])[0]
+
+def read_shimmer_csv(file_path, columns=None, dtype=np.float64, chunk_size=None):
+    """
+    Shimmer CSV를 필요한 컬럼만 골라 숫자 배열로 바로 읽습니다.
+    행마다 문자열을 split하지 않고 pandas C 파서로 한 번에 변환합니다.
+
+    :param file_path: Shimmer CSV 파일 경로.
+    :param columns: 읽을 컬럼 이름(또는 장치 ID를 뺀 접미사) 리스트. None이면 전체.
+    :param dtype: 데이터 컬럼 자료형 (float64 또는 float32). 타임스탬프 컬럼은 항상 float64.
+    :param chunk_size: 지정하면 chunk_size 행씩 읽은 ShimmerTable을 차례로 반환하는 제너레이터를 반환.
+    :return: ShimmerTable (chunk_size가 있으면 ShimmerTable 제너레이터).
+    """
+    sep, header, units = read_shimmer_header(file_path)
+    names = header if columns is None else resolve_columns(header, columns)
+    positions = [header.index(name) for name in names]
+    dtypes = {
+        position: np.float64 if header[position].endswith(SHIMMER_TIMESTAMP) else dtype
+        for position in positions
+    }
+    name_units = {name: units[header.index(name)] for name in names}
+    reader = pd.read_csv(
+        file_path,
+        sep=sep,
+        header=None,
+        skiprows=3,
+        usecols=positions,
+        dtype=dtypes,
+        engine='c',
+        chunksize=chunk_size,
+    )
+
+    def to_table(frame):
+        arrays = {name: frame[position].to_numpy() for name, position in zip(names, positions)}
+        return ShimmerTable(file_path, arrays, name_units)
+
+    if chunk_size is not None:
+        return (to_table(frame) for frame in reader)
+    return to_table(reader)
+
+def iter_timestamp_chunks(file_path, chunk_size):
+    """
+    Shimmer CSV 또는 비디오 타임스탬프 CSV에서 초 단위 타임스탬프를 chunk_size개씩 읽는 제너레이터.
+    """
+    if is_shimmer_csv(file_path):
+        for table in read_shimmer_csv(file_path, columns=[SHIMMER_TIMESTAMP], chunk_size=chunk_size):
+            yield table[SHIMMER_TIMESTAMP] / 1000.0
+    else:
+        for frame in pd.read_csv(file_path, usecols=['timestamp'], dtype={'timestamp': np.float64}, chunksize=chunk_size):
+            yield frame['timestamp'].to_numpy()
+
+SIDECAR_SUFFIX = '.cols.npz'
+
+def file_signature(file_path):
+    """
+    캐시 키로 쓰는 파일 식별 정보 (절대 경로, 수정 시각, 크기).
+    """
+    stat = os.stat(file_path)
+    return os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+
+class ParsedFileCache:
+    def __init__(self, max_bytes=512 * 1024 ** 2):
+        """
+        파싱된 Shimmer 컬럼을 파일 단위로 보관하는 LRU 캐시.
+        같은 CSV에서 나온 여러 모달리티(GSR, PPG 등)가 한 번의 파싱 결과를 공유합니다.
+
+        :param max_bytes: 캐시가 보관할 배열의 최대 총 바이트 수.
+        """
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = {}  # 키 -> 넣을 당시의 바이트 수 (항목이 제자리에서 갱신돼도 정확히 빼기 위함)
+        self.nbytes = 0
+
+    def get(self, key):
+        table = self.entries.get(key)
+        if table is not None:
+            self.entries.move_to_end(key)
+        return table
+
+    def put(self, key, table):
+        if key in self.entries:
+            del self.entries[key]
+            self.nbytes -= self.sizes.pop(key)
+        self.entries[key] = table
+        self.sizes[key] = self._table_bytes(table)
+        self.nbytes += self.sizes[key]
+        # 예산을 넘으면 가장 오래 쓰지 않은 파일부터 제거 (방금 넣은 항목은 유지)
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            evicted, _ = self.entries.popitem(last=False)
+            self.nbytes -= self.sizes.pop(evicted)
+
+    def clear(self):
+        self.entries.clear()
+        self.sizes.clear()
+        self.nbytes = 0
+
+    @staticmethod
+    def _table_bytes(table):
+        return sum(array.nbytes for array in table.arrays.values())
+
+PARSE_CACHE = ParsedFileCache()
+
+def write_sidecar(table, file_path):
+    """
+    파싱된 컬럼을 CSV 옆의 바이너리 컬럼 파일(.cols.npz)로 저장합니다.
+    원본 CSV의 수정 시각과 크기를 함께 저장해 다음 실행에서 유효성을 확인합니다.
+    """
+    _, mtime_ns, size = file_signature(file_path)
+    meta = {'mtime_ns': mtime_ns, 'size': size, 'columns': table.columns, 'units': table.units}
+    sidecar_path = file_path + SIDECAR_SUFFIX
+    temp_path = sidecar_path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        np.savez(file, __meta__=np.array(json.dumps(meta)), **table.arrays)
+    os.replace(temp_path, sidecar_path)
+
+def read_sidecar(file_path, columns=None, dtype=np.float64):
+    """
+    유효한 사이드카가 있으면 필요한 컬럼만 읽어 ShimmerTable로 반환합니다.
+
+    :return: ShimmerTable 또는 사이드카가 없거나 오래된 경우 None.
+    """
+    sidecar_path = file_path + SIDECAR_SUFFIX
+    if not os.path.exists(sidecar_path):
+        return None
+    _, mtime_ns, size = file_signature(file_path)
+    with np.load(sidecar_path) as sidecar:
+        meta = json.loads(str(sidecar['__meta__']))
+        if meta['mtime_ns'] != mtime_ns or meta['size'] != size:
+            return None
+        names = meta['columns'] if columns is None else resolve_columns(meta['columns'], columns)
+        arrays = {}
+        for name in names:
+            array = sidecar[name]
+            arrays[name] = array if name.endswith(SHIMMER_TIMESTAMP) else array.astype(dtype, copy=False)
+    return ShimmerTable(file_path, arrays, {name: meta['units'][name] for name in names})
+
+EEG_TIMESTAMP = 'timestamp'
+
+def count_data_rows(file_path, header_lines, block_size=16 * 1024 ** 2):
+    """
+    줄바꿈 문자 수로 텍스트 파일의 데이터 행 수(상한)를 빠르게 셉니다. 파일을 파싱하지 않습니다.
+    """
+    lines, last = 0, b'\n'
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(lines - header_lines, 0)
+
+def convert_eeg(file_path, store_path, timestamp_column=EEG_TIMESTAMP, timestamp_scale=1.0, chunk_size=100000):
+    """
+    EEG 기록을 한 번 읽어 float32 (샘플 수, 채널 수) 메모리 맵(signal_store matrix 형식)으로 변환합니다.
+    채널은 열 우선으로 저장되므로 일부 채널만 읽을 때 다른 채널의 데이터는 디스크에서 읽지 않습니다.
+    청크 단위로 파싱해 기록하므로 변환 중 메모리 사용량은 chunk_size에만 비례합니다.
+
+    :param file_path: EEG CSV 경로 (Shimmer 내보내기 형식 또는 타임스탬프 컬럼이 있는 일반 CSV).
+    :param store_path: 저장할 '.sig' 디렉토리 경로.
+    :param timestamp_column: 일반 CSV의 타임스탬프 컬럼 이름.
+    :param timestamp_scale: 일반 CSV 타임스탬프를 초로 바꾸는 배율 (ms이면 0.001). Shimmer CSV는 항상 ms.
+    :param chunk_size: 한 번에 파싱할 행 수.
+    :return: signal_store.SignalReader.
+    """
+    if is_shimmer_csv(file_path):
+        sep, header, units = read_shimmer_header(file_path)
+        timestamp_name = resolve_columns(header, [SHIMMER_TIMESTAMP])[0]
+        timestamp_scale, header_lines = 1 / 1000.0, 3
+    else:
+        sep, header_lines = ',', 1
+        header = pd.read_csv(file_path, nrows=0).columns.tolist()
+        units = [''] * len(header)
+        timestamp_name = timestamp_column
+        if timestamp_name not in header:
+            raise ValueError(f"The EEG CSV must contain a '{timestamp_name}' column.")
+    # 줄 끝 구분자 등으로 생긴 이름 없는 컬럼은 제외
+    channels = [name for name in header if name != timestamp_name and name and not name.startswith('Unnamed:')]
+    positions = [header.index(timestamp_name)] + [header.index(name) for name in channels]
+    dtypes = {position: np.float32 for position in positions[1:]}
+    dtypes[positions[0]] = np.float64
+
+    _, mtime_ns, size = file_signature(file_path)
+    source = {'file': os.path.basename(file_path), 'mtime_ns': mtime_ns, 'size': size,
+              'timestamp_column': timestamp_name, 'timestamp_scale': timestamp_scale}
+    with metrics.stage('ingest', file=os.path.basename(file_path)) as stage:
+        capacity = count_data_rows(file_path, header_lines)
+        reader = pd.read_csv(file_path, sep=sep, header=None, skiprows=header_lines, usecols=positions,
+                             dtype=dtypes, engine='c', chunksize=chunk_size)
+        with ss.SignalWriter(store_path, channels, units={name: units[header.index(name)] for name in channels},
+                             source=source, dtype=np.float32, capacity=capacity) as writer:
+            for frame in reader:
+                writer.write(frame[positions[0]].to_numpy() * timestamp_scale, frame[positions[1:]].to_numpy())
+                stage.count('samples', len(frame))
+        stage.count('channels', len(channels))
+    return ss.SignalReader(store_path)
 
 class DataLoader:
-    def __init__(self, data_path):
+    def __init__(self, data_path, cache=PARSE_CACHE, sidecar=False):
         """
         데이터가 저장된 경로를 초기화합니다.
 
         :param data_path: 데이터가 저장된 디렉토리 또는 파일 경로.
+        :param cache: 파싱 결과를 공유할 ParsedFileCache (None이면 캐시 사용 안 함).
+        :param sidecar: True이면 CSV 옆에 바이너리 컬럼 파일을 만들어 다음 실행에서 재사용.
         """
         if not os.path.exists(data_path):
             raise FileNotFoundError(f"The specified path does not exist: {data_path}")
         self.data_path = data_path
+        self.cache = cache
+        self.sidecar = sidecar
 
-    def load(self, file_name, file_type=None, delimiter='\n'):
+    @metrics.timed('load')
+    def load(self, file_name, file_type=None, delimiter='\n', columns=None, dtype=np.float64):
         """
         지정된 경로에서 파일을 로드합니다.
 
         :param file_name: 로드할 파일의 이름.
         :param file_type: 파일 형식(csv, json, excel, txt). None인 경우 확장자로 결정합니다.
         :param delimiter: 텍스트 파일(txt) 로드 시 사용할 구분자. 기본값은 '\n'.
-        :return: 로드된 데이터 (pandas DataFrame, dict 또는 list).
+        :param columns: Shimmer CSV에서 읽을 컬럼 이름 목록 (None이면 전체).
+        :param dtype: Shimmer CSV 데이터 컬럼의 자료형 (타임스탬프는 항상 float64).
+        :return: 로드된 데이터 (ShimmerTable, pandas DataFrame, dict 또는 list).
         """
         file_path = os.path.join(self.data_path, file_name)
 
@@ -54,6 +347,9 @@ class DataLoader:
 
         # 파일 형식에 따라 데이터 로드
         if file_type == 'csv':
+            # Shimmer 내보내기 형식('sep=' 줄 + 헤더 + 단위 줄)은 전용 파서로 읽음
+            if is_shimmer_csv(file_path):
+                return self.load_shimmer(file_path, columns=columns, dtype=dtype)
             return pd.read_csv(file_path)
         elif file_type == 'avi':
             return file_path  # 비디오 파일 경로 반환
@@ -70,13 +366,265 @@ class DataLoader:
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
 
+    def load_shimmer(self, file_path, columns=None, dtype=np.float64):
+        """
+        Shimmer CSV를 캐시 -> 사이드카 -> 텍스트 파싱 순서로 로드합니다.
+        처음 읽을 때는 모든 모달리티의 알려진 채널을 함께 파싱하고, 이후에는 캐시에 없는 컬럼만 새로 읽어
+        기존 항목에 합칩니다.
+
+        :param file_path: Shimmer CSV 파일 경로.
+        :param columns: 읽을 컬럼 이름(또는 접미사) 리스트. None이면 전체.
+        :param dtype: 데이터 컬럼 자료형.
+        :return: ShimmerTable.
+        """
+        key = file_signature(file_path) + (np.dtype(dtype).str,)
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            if columns is None:
+                _, header, _ = read_shimmer_header(file_path)
+                missing = [name for name in header if name not in cached.arrays]
+            else:
+                missing = [column for column in columns if not self._has_column(cached, column)]
+            if not missing:
+                return self._select(cached, columns)
+        elif columns is not None:
+            # 같은 파일의 다른 모달리티도 다시 파싱하지 않도록 알려진 채널을 모두 한 번에 읽음
+            _, header, _ = read_shimmer_header(file_path)
+            missing = known_shimmer_columns(header)
+            missing += [name for name in resolve_columns(header, columns) if name not in missing]
+        else:
+            missing = None
+
+        with metrics.stage('parse', file=os.path.basename(file_path)) as stage:
+            table = read_sidecar(file_path, columns=missing, dtype=dtype) if self.sidecar else None
+            if table is None:
+                if self.sidecar:
+                    # 사이드카는 모든 모달리티가 재사용하도록 전체 컬럼을 한 번에 파싱해 저장
+                    full = read_shimmer_csv(file_path, dtype=np.float64)
+                    write_sidecar(full, file_path)
+                    table = read_sidecar(file_path, columns=missing, dtype=dtype)
+                else:
+                    table = read_shimmer_csv(file_path, columns=missing, dtype=dtype)
+            stage.count('rows', len(table))
+            stage.count('columns', len(table.columns))
+
+        if cached is not None:
+            cached.arrays.update(table.arrays)
+            cached.units.update(table.units)
+            table = cached
+        if self.cache is not None:
+            self.cache.put(key, table)
+        return self._select(table, columns)
+
+    def load_eeg(self, file_name, timestamp_column=EEG_TIMESTAMP, timestamp_scale=1.0, chunk_size=100000):
+        """
+        EEG 기록을 메모리 맵 저장소로 로드합니다. 처음 한 번만 원본 옆의 '<파일 이름>.sig'로 변환하고,
+        이후에는 원본이 바뀌지 않았으면 변환 결과를 바로 엽니다. '.sig' 저장소를 직접 지정할 수도 있습니다.
+
+        :return: signal_store.SignalReader (values는 (샘플 수, 채널 수) float32 메모리 맵).
+        """
+        file_path = os.path.join(self.data_path, file_name)
+        if ss.is_signal_store(file_path):
+            return ss.SignalReader(file_path)
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        store_path = file_path + ss.STORE_SUFFIX
+        if os.path.exists(os.path.join(store_path, ss.META_FILE)):
+            reader = ss.SignalReader(store_path)
+            source = reader.meta.get('source') or {}
+            _, mtime_ns, size = file_signature(file_path)
+            if (source.get('mtime_ns'), source.get('size')) == (mtime_ns, size) and reader.values is not None:
+                return reader
+        return convert_eeg(file_path, store_path, timestamp_column, timestamp_scale, chunk_size)
+
+    @staticmethod
+    def _has_column(table, column):
+        try:
+            table.column_name(column)
+        except ValueError:
+            return False
+        return True
+
+    @staticmethod
+    def _select(table, columns):
+        if columns is None:
+            return table
+        names = resolve_columns(table.columns, columns)
+        return ShimmerTable(table.file_path, {name: table.arrays[name] for name in names}, {name: table.units[name] for name in names})
+
+FRAME_INDEX_SUFFIX = '.frames.npz'
+AVI_KEYFRAME = 0x10  # idx1 항목의 AVIIF_KEYFRAME 플래그
+
+def _riff_chunks(file, start, end):
+    """
+    [start, end) 범위의 RIFF 청크를 (id, 데이터 시작 위치, 크기, LIST 형식)으로 나열합니다. 데이터는 읽지 않습니다.
+    """
+    position = start
+    while position + 8 <= end:
+        file.seek(position)
+        header = file.read(12)
+        if len(header) < 8:
+            return
+        chunk_id, size = struct.unpack('<4sI', header[:8])
+        list_type = header[8:12] if chunk_id in (b'RIFF', b'LIST') else None
+        yield chunk_id, position + 8, size, list_type
+        position += 8 + size + (size & 1)
+
+def read_avi_index(video_path):
+    """
+    AVI 파일의 인덱스(OpenDML indx/ix## 또는 idx1)에서 비디오 프레임별 키프레임 여부, 파일 위치, 크기를 읽습니다.
+    프레임을 디코딩하지 않고 인덱스 청크만 읽으므로 긴 영상도 빠르게 처리됩니다.
+
+    :return: {'keyframe'(bool), 'offset'(청크 데이터 위치), 'size'} 배열 dict. 인덱스가 없으면 None.
+    """
+    with open(video_path, 'rb') as file:
+        file_size = os.fstat(file.fileno()).st_size
+        riffs = [(start, size) for chunk_id, start, size, kind in _riff_chunks(file, 0, file_size)
+                 if chunk_id == b'RIFF' and kind in (b'AVI ', b'AVIX')]
+        if not riffs:
+            return None
+        start, size = riffs[0]
+        top = list(_riff_chunks(file, start + 4, start + size))
+
+        # 스트림 헤더에서 비디오 스트림 번호와 OpenDML 상위 인덱스(indx) 위치를 찾음
+        stream, super_index, movi = None, None, None
+        for chunk_id, chunk_start, chunk_size, kind in top:
+            if kind == b'hdrl':
+                number = 0
+                for _, strl_start, strl_size, strl_kind in _riff_chunks(file, chunk_start + 4, chunk_start + chunk_size):
+                    if strl_kind != b'strl':
+                        continue
+                    for sub_id, sub_start, sub_size, _ in _riff_chunks(file, strl_start + 4, strl_start + strl_size):
+                        file.seek(sub_start)
+                        if sub_id == b'strh' and file.read(4) == b'vids' and stream is None:
+                            stream = number
+                        elif sub_id == b'indx' and number == stream:
+                            super_index = (sub_start, sub_size)
+                    number += 1
+            elif kind == b'movi':
+                movi = chunk_start
+        if stream is None:
+            return None
+        video_ids = (f'{stream:02d}dc'.encode(), f'{stream:02d}db'.encode())
+
+        if super_index is not None:
+            file.seek(super_index[0])
+            _, _, index_type, entries, _ = struct.unpack('<HBBI4s', file.read(12))
+            file.seek(super_index[0] + 24)
+            standard = [struct.unpack('<QII', file.read(16))[0] for _ in range(entries)] if index_type == 0 else []
+            keyframe, offset, size = [], [], []
+            for position in standard:
+                file.seek(position + 8)
+                _, _, _, count, _, base = struct.unpack('<HBBI4sQ', file.read(20))
+                file.seek(position + 32)
+                table = np.frombuffer(file.read(8 * count), dtype='<u4').reshape(-1, 2)
+                offset.append(base + table[:, 0].astype(np.int64))
+                size.append(table[:, 1] & 0x7FFFFFFF)
+                keyframe.append((table[:, 1] & 0x80000000) == 0)  # 최상위 비트가 켜져 있으면 키프레임이 아님
+            if standard:
+                return {'keyframe': np.concatenate(keyframe), 'offset': np.concatenate(offset),
+                        'size': np.concatenate(size).astype(np.int64)}
+
+        for chunk_id, chunk_start, chunk_size, _ in top:
+            if chunk_id != b'idx1' or movi is None:
+                continue
+            file.seek(chunk_start)
+            entries = np.frombuffer(file.read(chunk_size - chunk_size % 16),
+                                    dtype=[('id', 'S4'), ('flags', '<u4'), ('offset', '<u4'), ('size', '<u4')])
+            entries = entries[np.isin(entries['id'], video_ids)]
+            if len(entries) == 0:
+                return None
+            # idx1의 위치는 movi 기준(또는 일부 작성기에서는 파일 기준)이며, 청크 헤더를 가리킴
+            base = movi if entries['offset'][0] < movi else 0
+            return {
+                'keyframe': (entries['flags'] & AVI_KEYFRAME) != 0,
+                'offset': base + entries['offset'].astype(np.int64) + 8,
+                'size': entries['size'].astype(np.int64),
+            }
+    return None
+
+def build_frame_index(video_path, timestamps=None):
+    """
+    프레임 번호, 타임스탬프, 직전 키프레임 번호로 된 프레임 인덱스를 만듭니다.
+    AVI 인덱스가 없으면 디코딩 없이 grab()으로 프레임 수만 세고, 키프레임 정보는 -1로 둡니다.
+    타임스탬프가 주어지면 프레임 수가 같은지 이 단계에서 확인합니다.
+
+    :param video_path: 비디오 파일 경로.
+    :param timestamps: 프레임별 타임스탬프 (선택적).
+    :return: {'frame', 'timestamp', 'keyframe', 'offset', 'size'} 배열 dict.
+    """
+    with metrics.stage('index', file=os.path.basename(video_path)) as stage:
+        avi_index = read_avi_index(video_path) if video_path.lower().endswith('.avi') else None
+        if avi_index is not None:
+            count = len(avi_index['keyframe'])
+            # 각 프레임 이하에서 가장 가까운 키프레임 번호 (첫 프레임은 항상 시작점으로 취급)
+            marks = np.where(avi_index['keyframe'], np.arange(count), 0)
+            keyframe = np.maximum.accumulate(marks).astype(np.int64)
+            offset, size = avi_index['offset'], avi_index['size']
+        else:
+            cap = cv2.VideoCapture(video_path)
+            if not cap.isOpened():
+                raise ValueError(f"Cannot open video file: {video_path}")
+            count = 0
+            while cap.grab():
+                count += 1
+            cap.release()
+            keyframe = np.full(count, -1, dtype=np.int64)
+            offset = size = np.full(count, -1, dtype=np.int64)
+        stage.count('frames', count)
+
+        if timestamps is not None and len(timestamps) != count:
+            raise ValueError(f"Frame count ({count}) and timestamp count ({len(timestamps)}) do not match.")
+        return {
+            'frame': np.arange(count, dtype=np.int64),
+            'timestamp': np.asarray(timestamps, dtype=float) if timestamps is not None else np.full(count, np.nan),
+            'keyframe': keyframe,
+            'offset': offset,
+            'size': size,
+        }
+
+def write_frame_index(index, video_path, timestamp_path=None):
+    """
+    프레임 인덱스를 비디오 옆의 사이드카(.frames.npz)로 저장합니다.
+    비디오와 타임스탬프 CSV의 수정 시각과 크기를 함께 저장해 다음 실행에서 유효성을 확인합니다.
+    """
+    meta = {'video': list(file_signature(video_path)[1:]),
+            'timestamps': list(file_signature(timestamp_path)[1:]) if timestamp_path else None}
+    index_path = video_path + FRAME_INDEX_SUFFIX
+    temp_path = index_path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        np.savez(file, __meta__=np.array(json.dumps(meta)), **index)
+    os.replace(temp_path, index_path)
+
+def read_frame_index(video_path, timestamp_path=None):
+    """
+    유효한 프레임 인덱스 사이드카가 있으면 읽어 반환합니다.
+
+    :return: 프레임 인덱스 dict 또는 사이드카가 없거나 오래된 경우 None.
+    """
+    index_path = video_path + FRAME_INDEX_SUFFIX
+    if not os.path.exists(index_path):
+        return None
+    with np.load(index_path) as sidecar:
+        meta = json.loads(str(sidecar['__meta__']))
+        timestamps = list(file_signature(timestamp_path)[1:]) if timestamp_path else None
+        if meta['video'] != list(file_signature(video_path)[1:]) or meta['timestamps'] != timestamps:
+            return None
+        return {name: sidecar[name] for name in sidecar.files if name != '__meta__'}
+
 class VideoLoader:
-    def __init__(self, video_path, timestamp_path=None):
+    def __init__(self, video_path, timestamp_path=None, window=32, index=True):
         """
         비디오 데이터를 로드하고 프레임 및 타임스탬프를 추출합니다.
+        프레임은 필요할 때만 디코딩하며, 최근에 읽은 최대 window개의 프레임만 메모리에 보관합니다.
+        프레임 인덱스(비디오 옆의 .frames.npz 사이드카)가 있으면 임의 위치를 읽을 때 직전 키프레임으로
+        탐색한 뒤 필요한 프레임까지만 디코딩합니다.
 
         :param video_path: 비디오 파일 경로.
         :param timestamp_path: 타임스탬프 CSV 파일 경로 (선택적).
+        :param window: 메모리에 보관할 디코딩된 프레임의 최대 개수.
+        :param index: True이면 프레임 인덱스 사이드카를 읽거나 처음 한 번 만들어 저장.
         """
         if not os.path.exists(video_path):
             raise FileNotFoundError(f"Video file not found: {video_path}")
@@ -84,6 +632,30 @@ class VideoLoader:
         self.video_path = video_path
         self.timestamp_path = timestamp_path
         self.timestamps = self._load_timestamps() if timestamp_path else None
+        self.timestamp_array = np.asarray(self.timestamps, dtype=float) if self.timestamps is not None else None
+        self.window = window
+        self._frames = OrderedDict()  # 프레임 인덱스 -> 디코딩된 프레임 (LRU)
+        self._capture = None
+        self._position = 0  # _capture가 다음에 디코딩할 프레임 인덱스
+
+        self.frame_index = self._load_index() if index else None
+        self.keyframes = None
+        if self.frame_index is not None and len(self.frame_index['frame']) and self.frame_index['keyframe'][0] >= 0:
+            self.keyframes = self.frame_index['keyframe']
+
+        if self.frame_index is not None:
+            # 인덱스를 만들 때 타임스탬프 수와 이미 비교했으므로 디코딩 없이 프레임 수를 알 수 있음
+            self.frame_count = len(self.frame_index['frame'])
+        else:
+            cap = self._open()
+            self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            cap.release()
+
+        # 프레임 수와 타임스탬프 수 확인 (컨테이너가 프레임 수를 제공하는 경우)
+        if self.timestamps is not None and self.frame_count > 0 and self.frame_count != len(self.timestamps):
+            raise ValueError(
+                f"Frame count ({self.frame_count}) and timestamp count ({len(self.timestamps)}) do not match."
+            )
 
     def _load_timestamps(self):
         """
@@ -103,26 +675,165 @@ class VideoLoader:
         
         return timestamps['timestamp'].tolist()
 
-    def load_frames(self):
+    def _load_index(self):
         """
-        비디오 프레임을 로드하고 타임스탬프와 매핑합니다.
+        유효한 프레임 인덱스 사이드카를 읽고, 없으면 만들어 저장합니다 (저장할 수 없으면 메모리에만 보관).
+        """
+        index = read_frame_index(self.video_path, self.timestamp_path)
+        if index is not None:
+            if self.timestamps is not None and len(index['frame']) != len(self.timestamps):
+                raise ValueError(
+                    f"Frame count ({len(index['frame'])}) and timestamp count ({len(self.timestamps)}) do not match."
+                )
+            return index
+        index = build_frame_index(self.video_path, self.timestamp_array)
+        try:
+            write_frame_index(index, self.video_path, self.timestamp_path)
+        except OSError as e:
+            print(f"Warning: Cannot write frame index for {self.video_path}: {e}")
+        return index
 
-        :return: 프레임 데이터와 타임스탬프 데이터 (리스트로 반환).
+    def _seek(self, cap, index):
         """
-        cap = cv2.VideoCapture(self.video_path)
+        cap이 다음에 index 번째 프레임을 디코딩하도록 직전 키프레임으로 탐색한 뒤 앞으로 grab()합니다.
+        키프레임 정보가 없으면 백엔드의 프레임 탐색에 맡깁니다.
+        """
+        keyframe = int(self.keyframes[index]) if self.keyframes is not None else index
+        cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+        for _ in range(index - keyframe):
+            if not cap.grab():
+                raise ValueError(f"Cannot decode frame {keyframe} of {self.video_path}")
+        metrics.count('decoded_frames', index - keyframe)
+
+    def _should_seek(self, index):
+        # 현재 위치에서 이어서 디코딩하는 것이 직전 키프레임에서 다시 시작하는 것보다 비싸면 탐색
+        if index < self._position:
+            return True
+        if self.keyframes is not None:
+            return self._position < self.keyframes[index]
+        return index >= self._position + self.window
 
+    def _open(self):
+        cap = cv2.VideoCapture(self.video_path)
         if not cap.isOpened():
             raise ValueError(f"Cannot open video file: {self.video_path}")
+        return cap
 
-        frames = []
+    def __len__(self):
+        return len(self.timestamps) if self.timestamps is not None else self.frame_count
 
-        while True:
-            ret, frame = cap.read()
+    def __iter__(self):
+        return self.iter_frames()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.frame(i) for i in range(*index.indices(len(self)))]
+        return self.frame(index)
+
+    def frame(self, index):
+        """
+        index 번째 프레임을 반환합니다. 순차 접근은 이어서 디코딩하고, 그 외에는 탐색(seek)합니다.
+
+        :param index: 프레임 인덱스 (음수 허용).
+        :return: 프레임 (H, W, C) uint8 배열.
+        """
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"Frame index out of range: {index}")
+        if index in self._frames:
+            self._frames.move_to_end(index)
+            return self._frames[index]
+
+        if self._capture is None:
+            self._capture = self._open()
+            self._position = 0
+        # 가까운 앞쪽 프레임은 이어서 디코딩하는 편이 탐색보다 빠름
+        if self._should_seek(index):
+            self._seek(self._capture, index)
+            self._position = index
+        metrics.count('decoded_frames', index + 1 - self._position)
+        while self._position <= index:
+            ret, frame = self._capture.read()
             if not ret:
-                break
-            frames.append(frame)
+                raise ValueError(f"Cannot decode frame {self._position} of {self.video_path}")
+            self._remember(self._position, frame)
+            self._position += 1
+        return frame
 
-        cap.release()
+    def _remember(self, index, frame):
+        self._frames[index] = frame
+        self._frames.move_to_end(index)
+        while len(self._frames) > self.window:
+            self._frames.popitem(last=False)
+
+    def iter_frames(self, start=0, stop=None):
+        """
+        [start, stop) 구간의 프레임을 순서대로 하나씩 디코딩해 반환하는 제너레이터 (stop이 None이면 끝까지).
+        별도의 VideoCapture를 사용하므로 frame()의 캐시나 위치에 영향을 주지 않습니다.
+        start가 0이 아니면 직전 키프레임으로 탐색해 구간 앞의 프레임은 디코딩만 하고 변환하지 않습니다.
+        """
+        if start >= len(self):
+            return
+        cap = self._open()
+        try:
+            if start > 0:
+                self._seek(cap, start)
+            index = start
+            while stop is None or index < stop:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                yield frame
+                index += 1
+        finally:
+            cap.release()
+
+    def index_at(self, timestamp):
+        """
+        timestamp에 가장 가까운 프레임의 인덱스를 이진 탐색으로 찾습니다.
+        """
+        if self.timestamp_array is None:
+            raise ValueError("Timestamps are required for timestamp-based access.")
+        timestamps = self.timestamp_array
+        right = int(np.searchsorted(timestamps, timestamp))
+        if right == 0:
+            return 0
+        if right == len(timestamps):
+            return len(timestamps) - 1
+        return right if timestamps[right] - timestamp < timestamp - timestamps[right - 1] else right - 1
+
+    def frame_at(self, timestamp):
+        """
+        timestamp에 가장 가까운 프레임을 반환합니다.
+        """
+        return self.frame(self.index_at(timestamp))
+
+    def frames_between(self, t0, t1):
+        """
+        t0 <= timestamp <= t1 구간의 (타임스탬프, 프레임)을 순서대로 반환하는 제너레이터.
+        """
+        if self.timestamp_array is None:
+            raise ValueError("Timestamps are required for timestamp-based access.")
+        start = int(np.searchsorted(self.timestamp_array, t0, side='left'))
+        stop = int(np.searchsorted(self.timestamp_array, t1, side='right'))
+        for index, frame in enumerate(self.iter_frames(start, stop), start):
+            yield self.timestamps[index], frame
+
+    def close(self):
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
+        self._frames.clear()
+
+    def load_frames(self):
+        """
+        비디오 프레임을 로드하고 타임스탬프와 매핑합니다.
+        모든 프레임을 메모리에 올리므로 짧은 영상에만 사용하고, 긴 영상은 iter_frames()/frame_at()을 사용하세요.
+
+        :return: 프레임 데이터와 타임스탬프 데이터 (리스트로 반환).
+        """
+        frames = list(self.iter_frames())
 
         # 프레임 수와 타임스탬프 수 확인
         if self.timestamps is not None and len(frames) != len(self.timestamps):
@@ -132,17 +843,66 @@ class VideoLoader:
 
         return frames, self.timestamps
 
+class TimeIndex:
+    def __init__(self, timestamps):
+        """
+        Data 객체의 타임스탬프를 검증된 정렬 인덱스로 보관합니다.
+        로드 시 한 번만 단조 증가 여부를 검사하고, 구간 질의는 이진 탐색으로 처리합니다.
+
+        :param timestamps: 타임스탬프 배열 (초 단위 Unix 시간).
+        """
+        self.values = np.asarray(timestamps, dtype=float)
+        differences = np.diff(self.values)
+        self.non_monotonic = np.flatnonzero(differences < 0) + 1  # 이전 샘플보다 시간이 앞선 샘플 인덱스
+        self.duplicates = np.flatnonzero(differences == 0) + 1
+        self.is_monotonic = len(self.non_monotonic) == 0
+        if not self.is_monotonic:
+            print(
+                f"Warning: {len(self.non_monotonic)} non-monotonic samples "
+                f"(first at index {self.non_monotonic[0]}). Range queries fall back to boolean masks."
+            )
+
+    def __len__(self):
+        return len(self.values)
+
+    def report(self):
+        """
+        타임스탬프 검사 결과를 dict로 반환합니다.
+        """
+        return {
+            'samples': len(self.values),
+            'monotonic': self.is_monotonic,
+            'non_monotonic': self.non_monotonic.tolist(),
+            'duplicates': len(self.duplicates),
+        }
+
+    def locate(self, start_time, end_time):
+        """
+        start_time <= timestamp <= end_time 인 샘플의 위치를 반환합니다.
+
+        :return: 단조 증가이면 slice (O(log N)), 아니면 정수 인덱스 배열.
+        """
+        if self.is_monotonic:
+            start = int(np.searchsorted(self.values, start_time, side='left'))
+            stop = int(np.searchsorted(self.values, end_time, side='right'))
+            return slice(start, max(start, stop))
+        return np.flatnonzero((self.values >= start_time) & (self.values <= end_time))
+
 class Data:
-    def __init__(self, modality_type, data_file_name, timestamp_file_name=None):
+    def __init__(self, modality_type, data_file_name, timestamp_file_name=None, dtype=np.float64, loader=None,
+                 channels=None):
         """
         :param modality_type: 데이터 모달리티 [EEG, ECG, GSR, PPG, VIDEO].
         :param data_file_name: 데이터 파일 이름.
         :param timestamp_file_name: VIDEO 타임스탬프 파일 이름.
+        :param dtype: 신호 데이터 자료형 (float64 또는 float32). EEG는 항상 float32 메모리 맵.
+        :param loader: 사용할 DataLoader (None이면 './recordings/Input' 기본 로더).
+        :param channels: EEG에서 사용할 채널 이름 리스트 (None이면 전체).
         """
         self.modality_type = modality_type
         self.data_file_name = data_file_name
         self.timestamp_file_name = timestamp_file_name
-        self.loader = DataLoader('./recordings/Input')
+        self.loader = loader if loader is not None else DataLoader('./recordings/Input')
         self.column = []
         self.name = modality_type
         
@@ -154,36 +914,70 @@ class Data:
                 else None
             )
             self.video_loader = VideoLoader(video_path, timestamp_path)
-            self.frames, self.timestamp = self.video_loader.load_frames()
+            # 프레임은 미리 디코딩하지 않고 필요할 때 읽는 지연 프레임 소스로 보관
+            self.frames = self.video_loader
+            self.timestamp = pd.Series(self.video_loader.timestamp_array) if self.video_loader.timestamps is not None else None
             self.data = self.frames
+            self.values = None
+        elif modality_type == 'EEG':
+            # 값은 메모리에 올리지 않고 변환된 저장소의 메모리 맵 view로 보관
+            self.store = self.loader.load_eeg(self.data_file_name)
+            self.column = list(self.store.columns) if channels is None else resolve_columns(self.store.columns, channels)
+            self.units = {column: self.store.units.get(column, '') for column in self.column}
+            self.timestamp = pd.Series(self.store.timestamps, copy=False)
+            self.values = self.store.matrix(self.column)
+            self.data = pd.DataFrame(self.values, columns=self.column, copy=False)
         else:
-            self.load_data = self.loader.load(self.data_file_name)
+            self.load_data = self.loader.load(
+                self.data_file_name,
+                columns=[SHIMMER_TIMESTAMP] + SHIMMER_CHANNELS.get(modality_type, []),
+                dtype=dtype,
+            )
+            self.units = {}
             self.timestamp = self.get_timestamp()
             self.data = self.get_data()
+            self.values = self.data.to_numpy()  # (샘플 수, 채널 수), data와 메모리 공유
+
+        self.time_index = TimeIndex(self.timestamp) if self.timestamp is not None else None
 
     def __str__(self):
         return self.name  # 객체를 문자열로 변환할 때 반환되는 값
 
+    def range_slice(self, interpolate_range):
+        """
+        시간 범위에 해당하는 샘플 위치를 이진 탐색으로 찾습니다.
+
+        :param interpolate_range: [시작 시간, 종료 시간] (표준 시간 문자열 또는 Unix 시간).
+        :return: slice (타임스탬프가 단조 증가하지 않으면 정수 인덱스 배열).
+        """
+        return self.time_index.locate(*range_to_unix(interpolate_range))
+
+    def select(self, interpolate_range, columns=None):
+        """
+        시간 범위의 타임스탬프와 값을 반환합니다. 타임스탬프가 단조 증가하면 복사 없는 view입니다.
+
+        :param interpolate_range: [시작 시간, 종료 시간] (표준 시간 문자열 또는 Unix 시간).
+        :param columns: 반환할 채널 이름 리스트 (None이면 전체). 구간 안의 선택한 채널만 복사합니다.
+        :return: (타임스탬프 배열, (샘플 수, 채널 수) 값 배열). VIDEO는 값 대신 None.
+        """
+        positions = self.range_slice(interpolate_range)
+        values = self.values[positions] if self.values is not None else None
+        if values is not None and columns is not None:
+            values = values[:, [self.column.index(column) for column in resolve_columns(self.column, columns)]]
+        return self.time_index.values[positions], values
+
     def get_timestamp(self):
         if self.modality_type in ['ECG', 'GSR', 'PPG']:
-            temp = self.load_data['sep=\t'][2:].apply(lambda x: float(x.split('\t')[0])/1000.0)
-            temp.index = pd.RangeIndex(start=0, stop=len(temp), step = 1)
-            return temp
+            # ms 단위 Unix 시간을 초 단위로 변환
+            return pd.Series(self.load_data[SHIMMER_TIMESTAMP] / 1000.0)
         # add new modality here
 
     def get_data(self):
-        if self.modality_type == 'ECG':
-            temp = self.load_data['sep=\t'][2:].apply(lambda x: x.split('\t')[3:])
-            temp = pd.DataFrame(temp.tolist(), columns=['id820D_ECG_LA-RA_24BIT_CAL', 'id820D_ECG_LL-LA_24BIT_CAL', 'id820D_ECG_LL-RA_24BIT_CAL', 'id820D_ECG_Vx-RL_24BIT_CAL','?'])
-            self.column = ['id820D_ECG_LA-RA_24BIT_CAL', 'id820D_ECG_LL-LA_24BIT_CAL', 'id820D_ECG_LL-RA_24BIT_CAL', 'id820D_ECG_Vx-RL_24BIT_CAL']
-        elif self.modality_type == 'GSR':
-            temp = self.load_data['sep=\t'][2:].apply(lambda x: x.split('\t')[2:4])
-            temp = pd.DataFrame(temp.tolist(), columns=['id95AE_GSR_Skin_Conductance_CAL', 'id95AE_GSR_Skin_Resistance_CAL'])
-            self.column = ['id95AE_GSR_Skin_Conductance_CAL', 'id95AE_GSR_Skin_Resistance_CAL']
-        elif self.modality_type == 'PPG':
-            temp = self.load_data['sep=\t'][2:].apply(lambda x: x.split('\t')[4])
-            temp = pd.DataFrame(temp.tolist(), columns=['id95AE_PPG_A13_CAL'])
-            self.column = ['id95AE_PPG_A13_CAL']
+        if self.modality_type in SHIMMER_CHANNELS:
+            self.column = [self.load_data.column_name(channel) for channel in SHIMMER_CHANNELS[self.modality_type]]
+            self.units = {column: self.load_data.units[column] for column in self.column}
+            values = np.column_stack([self.load_data[column] for column in self.column])
+            temp = pd.DataFrame(values, columns=self.column, copy=False)
         # add new modality here
         # print(temp)
         return temp
@@ -225,56 +1019,271 @@ def standard_to_unix(standard_time, timezone_offset=0):
     except Exception as e:
         return f"오류 발생: {e}"
 
+_cached_standard_to_unix = lru_cache(maxsize=1024)(standard_to_unix)
+
+def range_to_unix(interpolate_range):
+    """
+    보간 범위를 Unix 시간 (시작, 종료)로 변환. 문자열 변환 결과는 캐시해 재사용합니다.
+
+    :param interpolate_range: [시작 시간, 종료 시간] (표준 시간 문자열 또는 Unix 시간).
+    :return: (시작 Unix 시간, 종료 Unix 시간).
+    """
+    return tuple(
+        _cached_standard_to_unix(time) if isinstance(time, str) else float(time)
+        for time in interpolate_range
+    )
+
 def get_data_point_index(target_signal, interpolate_range):
-    return target_signal.timestamp[(target_signal.timestamp >= standard_to_unix(interpolate_range[0])) & (target_signal.timestamp <= standard_to_unix(interpolate_range[1]))].index
+    time_index = getattr(target_signal, 'time_index', None)
+    if time_index is None:
+        time_index = TimeIndex(target_signal.timestamp)
+    positions = time_index.locate(*range_to_unix(interpolate_range))
+    if isinstance(positions, slice):
+        return pd.RangeIndex(positions.start, positions.stop)
+    return target_signal.timestamp.index[positions]
+
+RESAMPLER_CACHE_SIZE = 32
+_resampler_cache = OrderedDict()  # (id(target), kind) -> (weakref, 데이터 식별자, Resampler)
+
+def get_resampler(target, kind='cubic'):
+    """
+    대상 신호의 모든 채널에 대한 Resampler를 LRU 캐시에서 가져오거나 새로 생성.
+    같은 대상에 대한 반복 구간 질의는 스플라인 계수를 다시 계산하지 않습니다.
+    대상 Data 객체는 변경하지 않습니다.
+
+    :param target: 보간 대상 Data 객체.
+    :param kind: 보간 방식 ('linear', 'quadratic', 'cubic').
+    :return: sync.Resampler.
+    """
+    key = (id(target), kind)
+    # timestamp/data가 다른 객체로 바뀌었으면 캐시 항목을 다시 만듦
+    source = (id(target.timestamp), id(target.data), tuple(target.column))
+    entry = _resampler_cache.get(key)
+    if entry is not None and entry[0]() is target and entry[1] == source:
+        _resampler_cache.move_to_end(key)
+        return entry[2]
+
+    resampler = sc.Resampler(target.timestamp, target.data[target.column], kind=kind)
+    metrics.count('resampler_fits')
+    _resampler_cache[key] = (weakref.ref(target), source, resampler)
+    _resampler_cache.move_to_end(key)
+    while len(_resampler_cache) > RESAMPLER_CACHE_SIZE:
+        _resampler_cache.popitem(last=False)
+    return resampler
+
+WINDOWED_MODALITIES = ('EEG',)
+RESAMPLE_WINDOW_OVERLAP = 32
+
+def resampler_for(target, timestamps, kind='cubic', overlap=RESAMPLE_WINDOW_OVERLAP):
+    """
+    질의 시점들에 사용할 대상 신호의 Resampler.
+    메모리 맵 기반 모달리티(EEG)는 전체 기록 대신 질의 구간과 앞뒤 overlap개 샘플의 view로만
+    스플라인을 만듭니다. 경계 처리는 interpolate_chunked와 같아 전체 보간과 같은 결과를 냅니다.
+    그 외 모달리티는 get_resampler의 캐시를 사용합니다.
+    """
+    if target.modality_type not in WINDOWED_MODALITIES or len(timestamps) == 0:
+        return get_resampler(target, kind)
+    positions = target.time_index.locate(np.min(timestamps), np.max(timestamps))
+    if not isinstance(positions, slice):
+        return get_resampler(target, kind)
+    start = max(0, positions.start - overlap)
+    stop = min(len(target.time_index), positions.stop + overlap)
+    metrics.count('resampler_fits')
+    return sc.Resampler(target.time_index.values[start:stop], target.values[start:stop], kind=kind)
 
 def interpolate(data, target, interpolate_range):
     """
-    데이터를 기준으로 값을 선형 보간(interpolation)하는 함수.
+    데이터를 기준으로 값을 보간(interpolation)하는 함수.
     :param data: 보간에 사용할 데이터. 반드시 'timestamp'가 포함되어야함
     :param target: 보간 데상 데이터프레임. 반드시 'timestamp'와 'data'가 포함되어야함
     :param interpolate_range: 보간할 시간 범위
     :return: 보간된 값의 리스트.
     """
     try:
-        print('interpolate range: ',interpolate_range[0],'~',interpolate_range[1])
-        # 구간 내 데이터 포인트의 인덱스
-        interpolate_data_point_idx = get_data_point_index(target_signal=data, interpolate_range=interpolate_range)
-
-        # 보간할 timestamp
-        interpolate_timestamp = np.array(data.timestamp[interpolate_data_point_idx], dtype=float)
-
-        # 데이터 타입 변환
-        target.timestamp = target.timestamp.astype(float)
-        target.data = target.data.replace('', np.nan).infer_objects()  # 빈 문자열을 NaN으로 변환
-        target.data = target.data.astype(float)
-
-        # 선형 보간 수행
-        result = {}
-        for column in target.column:
-            # 보간 함수 생성 (선형 보간 사용)
-            interpolation_function = interp1d(
-                target.timestamp, 
-                target.data[column], 
-                kind='cubic', 
-                bounds_error=False,  # 범위 밖 값 처리
-                fill_value='extrapolate',  # 범위 밖 값 보간 허용
-                assume_sorted= True,
-            )
-            # 각 열에 대해 선형 보간 수행
-            interpolated_values = interpolation_function(interpolate_timestamp)
-            # # 각 열에 대해 선형 보간 수행
-            # interpolated_values = np.interp(interpolate_timestamp, target.timestamp, target.data[column])
-            result[column] = interpolated_values
-        # 결과를 DataFrame으로 변환
-        result_df = pd.DataFrame(result, index = interpolate_timestamp)
-        result_df.index_name = 'timestamp' # 인덱스 이름 설정
-
-        return result_df
+        with metrics.stage('interpolate', target=str(target), range=[str(value) for value in interpolate_range]):
+            # 구간 내 데이터 포인트의 인덱스 (구간 선택은 호출당 한 번만 측정)
+            with metrics.stage('range_select') as stage:
+                interpolate_data_point_idx = get_data_point_index(target_signal=data, interpolate_range=interpolate_range)
+
+                # 보간할 timestamp
+                interpolate_timestamp = np.array(data.timestamp[interpolate_data_point_idx], dtype=float)
+                stage.count('samples', len(interpolate_timestamp))
+
+            # 모든 열을 한 번에 3차 스플라인 보간
+            with metrics.stage('resample', target=str(target)) as stage:
+                interpolated_values = resampler_for(target, interpolate_timestamp).resample(interpolate_timestamp)
+                stage.count('samples', len(interpolate_timestamp))
+
+            # 결과를 DataFrame으로 변환
+            result_df = pd.DataFrame(interpolated_values, columns=target.column, index = interpolate_timestamp)
+            result_df.index_name = 'timestamp' # 인덱스 이름 설정
+
+            return result_df
     
     except Exception as e:
         return f"오류 발생: {e}"
 
+class SyncSession:
+    def __init__(self, reference, targets, interpolate_range, kind='cubic'):
+        """
+        하나의 기준 신호에 여러 대상 신호를 한 번에 동기화하는 세션.
+        기준 시간축은 한 번만 계산하고, 대상마다 보간 함수를 하나만 만들어 모든 채널을 함께 보간합니다.
+        입력 Data 객체는 변경하지 않습니다.
+
+        :param reference: 보간 기준이 되는 Data 객체.
+        :param targets: 보간 시키려는 Data 객체 리스트.
+        :param interpolate_range: 보간할 시간 범위 [시작 시간, 종료 시간].
+        :param kind: 보간 방식 ('linear', 'quadratic', 'cubic').
+        """
+        self.reference = reference
+        self.targets = list(targets)
+        self.interpolate_range = interpolate_range
+        self.kind = kind
+        self._timestamps = None
+
+        self.columns = [column for target in self.targets for column in target.column]
+        if len(set(self.columns)) != len(self.columns):
+            raise ValueError(f"Target columns must be unique across targets: {self.columns}")
+
+    @property
+    def timestamps(self):
+        """
+        기준 신호의 보간 구간 타임스탬프 (한 번만 계산).
+        """
+        if self._timestamps is None:
+            with metrics.stage('range_select', reference=str(self.reference)) as stage:
+                self._timestamps = np.array(self.reference.select(self.interpolate_range)[0], dtype=float)
+                stage.count('samples', len(self._timestamps))
+        return self._timestamps
+
+    def run_array(self):
+        """
+        모든 대상의 모든 채널을 기준 시간축에 보간해 하나의 배열로 반환.
+
+        :return: (타임스탬프 배열, (시점 수, 전체 채널 수) 배열, 컬럼 이름 리스트).
+        """
+        timestamps = self.timestamps
+        values = np.empty((len(timestamps), len(self.columns)), dtype=float)
+        offset = 0
+        for target in self.targets:
+            width = len(target.column)
+            with metrics.stage('resample', target=str(target)) as stage:
+                values[:, offset:offset + width] = resampler_for(target, timestamps, self.kind).resample(timestamps)
+                stage.count('samples', len(timestamps))
+            offset += width
+        return timestamps, values, self.columns
+
+    def run(self):
+        """
+        동기화 결과를 기준 타임스탬프를 인덱스로 하는 하나의 DataFrame으로 반환.
+        """
+        timestamps, values, columns = self.run_array()
+        return pd.DataFrame(values, columns=columns, index=pd.Index(timestamps, name='timestamp'))
+
+    @property
+    def units(self):
+        return {column: unit for target in self.targets for column, unit in getattr(target, 'units', {}).items()}
+
+    def write(self, output_dir, result=None):
+        """
+        대상별로 interp_{target}_2_{reference}.sig 바이너리 저장소에 결과를 저장합니다.
+        저장소에는 단위와 원본/기준 파일 정보가 함께 기록됩니다.
+
+        :param output_dir: 저장할 디렉토리.
+        :param result: run()의 결과 (None이면 새로 실행).
+        :return: 대상 이름 -> 저장 경로 dict.
+        """
+        result = self.run() if result is None else result
+        reference = {'modality': str(self.reference), 'file': self.reference.data_file_name}
+        paths = {}
+        for target in self.targets:
+            path = os.path.join(output_dir, f'interp_{target}_2_{self.reference}{ss.STORE_SUFFIX}')
+            source = {'modality': str(target), 'file': target.data_file_name}
+            with metrics.stage('write', target=str(target)) as stage:
+                ss.write_signals(path, result[target.column], units=self.units, source=source, reference=reference)
+                stage.count('samples', len(result))
+            paths[str(target)] = path
+        return paths
+
+@metrics.timed('interpolate_chunked')
+def interpolate_chunked(reference_path, target_path, target_modality, output_path, interpolate_range=None,
+                        chunk_size=100000, overlap=32, kind='cubic', dtype=np.float64):
+    """
+    파일 전체를 메모리에 올리지 않고 기준/대상 파일을 청크 단위로 읽어 보간 결과를 CSV에 이어 씁니다.
+    각 청크는 앞뒤로 overlap개의 대상 샘플을 더 포함해 보간하므로, 3차 스플라인의 경계 영향
+    (매듭마다 약 0.27배로 감소)이 float64 정밀도 아래로 떨어져 전체 보간과 같은 결과를 냅니다.
+    메모리 사용량은 기록 길이와 무관하게 청크 크기에만 비례합니다.
+
+    :param reference_path: 기준 파일 경로 (Shimmer CSV 또는 'timestamp' 컬럼이 있는 비디오 타임스탬프 CSV).
+    :param target_path: 대상 Shimmer CSV 경로.
+    :param target_modality: 대상 모달리티 (ECG, GSR, PPG).
+    :param output_path: 결과 경로 ('.sig'로 끝나면 바이너리 컬럼 저장소, 아니면 CSV).
+    :param interpolate_range: 보간할 시간 범위 [시작 시간, 종료 시간]. None이면 기준 파일 전체.
+    :param chunk_size: 한 번에 읽을 행 수.
+    :param overlap: 청크 앞뒤로 추가로 유지할 대상 샘플 수.
+    :param kind: 보간 방식 ('linear', 'quadratic', 'cubic').
+    :param dtype: 대상 데이터 컬럼 자료형.
+    :return: 기록한 행 수.
+    """
+    start_time, end_time = range_to_unix(interpolate_range) if interpolate_range is not None else (-np.inf, np.inf)
+    channels = SHIMMER_CHANNELS[target_modality]
+    target_chunks = read_shimmer_csv(target_path, columns=[SHIMMER_TIMESTAMP] + channels, dtype=dtype, chunk_size=chunk_size)
+
+    buffer_timestamps = np.empty(0)
+    buffer_values = np.empty((0, len(channels)))
+    columns = None
+    exhausted = False
+    rows = 0
+
+    binary = ss.is_signal_store(output_path)
+    writer = None
+    # 바이너리 저장소는 첫 청크에서 컬럼 이름과 단위를 알게 된 뒤 SignalWriter를 만듦
+    output = contextlib.nullcontext() if binary else open(output_path, 'w', newline='', encoding='utf-8')
+    with output:
+        for query in iter_timestamp_chunks(reference_path, chunk_size):
+            if query[0] > end_time:
+                break
+            query = query[(query >= start_time) & (query <= end_time)]
+            if len(query) == 0:
+                continue
+
+            # 마지막 질의 시점 뒤로 overlap개의 대상 샘플이 생길 때까지 대상 청크를 읽음
+            while not exhausted and len(buffer_timestamps) - np.searchsorted(buffer_timestamps, query[-1], side='right') < overlap:
+                try:
+                    table = next(target_chunks)
+                except StopIteration:
+                    exhausted = True
+                    break
+                columns = [table.column_name(channel) for channel in channels]
+                buffer_timestamps = np.concatenate([buffer_timestamps, table[SHIMMER_TIMESTAMP] / 1000.0])
+                buffer_values = np.concatenate([buffer_values, np.column_stack([table[column] for column in columns])])
+
+            # 첫 질의 시점 앞쪽은 overlap개만 남기고 버림 (다음 청크는 더 뒤의 샘플만 필요)
+            keep_from = max(0, int(np.searchsorted(buffer_timestamps, query[0], side='right')) - 1 - overlap)
+            buffer_timestamps = buffer_timestamps[keep_from:]
+            buffer_values = buffer_values[keep_from:]
+
+            with metrics.stage('resample', target=target_modality) as stage:
+                values = sc.Resampler(buffer_timestamps, buffer_values, kind=kind).resample(query)
+                stage.count('samples', len(query))
+            with metrics.stage('write', target=target_modality) as stage:
+                if binary:
+                    if writer is None:
+                        source = {'modality': target_modality, 'file': os.path.basename(target_path)}
+                        units = {column: table.units[column] for column in columns}
+                        writer = ss.SignalWriter(output_path, columns, units=units, source=source,
+                                                 reference={'file': os.path.basename(reference_path)})
+                    writer.write(query, values)
+                else:
+                    frame = pd.DataFrame(values, columns=columns, index=pd.Index(query, name='timestamp'))
+                    frame.to_csv(output, header=(rows == 0))
+                stage.count('samples', len(query))
+            rows += len(query)
+
+    if writer is not None:
+        writer.close()
+    return rows
+
 def plot_signals(original_data, interpolated_data, interpolate_range, column_to_plot):
     """
     원래 신호와 보간된 신호를 플롯하는 함수.
@@ -331,7 +1340,7 @@ def plot_signals(original_data, interpolated_data, interpolate_range, column_to_
 
 if __name__ == "__main__":
     data_path = "./recordings/Input"
-    loader = DataLoader(data_path)
+    loader = DataLoader(data_path, sidecar=True)
 
     EEG_file_name = ''
     ECG_file_name = 'LJY250110_E_Session1_id820D_Calibrated_SD.csv'
@@ -341,10 +1350,11 @@ if __name__ == "__main__":
     video_file_name = 'LJY250110_V.avi'
     video_timestamp_name = 'LJY250110_V.csv'
 
-    ECG = Data('ECG', ECG_file_name)
-    GSR = Data('GSR', GSR_file_name)
-    PPG = Data('PPG', PPG_file_name)
+    ECG = Data('ECG', ECG_file_name, loader=loader)
+    GSR = Data('GSR', GSR_file_name, loader=loader)
+    PPG = Data('PPG', PPG_file_name, loader=loader)
     # VIDEO = Data('VIDEO', video_file_name, video_timestamp_name)
+    # EEG = Data('EEG', EEG_file_name, loader=loader)  # 처음 한 번 float32 메모리 맵 저장소로 변환
 
     # print(ECG.timestamp, ECG.data)
     # print(GSR.timestamp, GSR.data)
@@ -365,15 +1375,15 @@ if __name__ == "__main__":
     t1 = str(target1)
     t2 = str(target2)
 
-    # 보간 수행
-    interpolate_result1 = interpolate(data=data, target=target1, interpolate_range=interpolate_range)
-    interpolate_result2 = interpolate(data=data, target=target2, interpolate_range=interpolate_range)
-
-    csv_file_path1 = f'C:\\Users\\이동혁\\Desktop\\vidcap\\Data_Synchronization\\interpolated_signals\\interp_{t1}_2_{data}.csv'
-    csv_file_path2 = f'C:\\Users\\이동혁\\Desktop\\vidcap\\Data_Synchronization\\interpolated_signals\\interp_{t2}_2_{data}.csv'
+    # 보간 수행 (모든 대상 신호를 한 번에 동기화)
+    session = SyncSession(reference=data, targets=[target1, target2], interpolate_range=interpolate_range)
+    sync_result = session.run()
+    interpolate_result1 = sync_result[target1.column]
+    interpolate_result2 = sync_result[target2.column]
 
-    interpolate_result1.to_csv(csv_file_path1, index=True, encoding='utf-8')
-    interpolate_result2.to_csv(csv_file_path2, index=True, encoding='utf-8')
+    # 바이너리 컬럼 저장소(interp_{target}_2_{reference}.sig)로 저장. 다시 읽을 때는 signal_store.read_signals 사용
+    session.write('interpolated_signals', result=sync_result)
+    metrics.REGISTRY.report()  # 단계별 소요 시간 요약
 
     # 보간된 결과 비교
     column_to_plot = "id95AE_PPG_A13_CAL"  # 플롯할 컬럼명 (보간 기준이 되는 신호에 포함된 컬럼명이여야 함.)
@@ -0,0 +1,162 @@
+import copy
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy.signal import butter, iirnotch, tf2sos, sosfiltfilt, sosfilt, sosfilt_zi
+
+# 모달리티별 기본 필터 체인: (필터 종류, 차단 주파수, 차수). notch의 차수 자리는 품질 계수 Q
+MODALITY_FILTERS = {
+    'GSR': [('lowpass', 5.0, 5)],
+    'ECG': [('bandpass', (0.5, 40.0), 4), ('notch', 60.0, 30.0)],
+    'PPG': [('bandpass', (0.5, 8.0), 4)],
+}
+
+@lru_cache(maxsize=128)
+def design_sos(btype, cutoff, order, fs):
+    """
+    필터 계수를 SOS(second-order sections) 형식으로 설계하고 캐시합니다.
+    같은 (종류, 차단 주파수, 차수, fs) 조합은 한 번만 설계합니다.
+
+    :param btype: 'lowpass', 'highpass', 'bandpass', 'bandstop' 또는 'notch'.
+    :param cutoff: 차단 주파수 (Hz). band 계열은 (low, high) 튜플.
+    :param order: Butterworth 차수 (notch는 품질 계수 Q).
+    :param fs: 샘플링 레이트 (Hz).
+    :return: (섹션 수, 6) SOS 배열.
+    """
+    nyquist = 0.5 * fs  # 나이퀴스트 주파수 계산
+    if np.any(np.asarray(cutoff) >= nyquist):
+        raise ValueError(f"Cutoff {cutoff} Hz must be below the Nyquist frequency ({nyquist} Hz).")
+    if btype == 'notch':
+        b, a = iirnotch(cutoff, order, fs=fs)
+        return tf2sos(b, a)
+    return butter(order, cutoff, btype=btype, fs=fs, output='sos')
+
+def _design(stage, fs):
+    btype, cutoff, order = stage
+    # lru_cache 키로 쓸 수 있도록 리스트 차단 주파수는 튜플로 변환
+    return design_sos(btype, tuple(cutoff) if np.ndim(cutoff) else float(cutoff), order, float(fs))
+
+def fill_gaps(values):
+    """
+    NaN/inf 샘플을 채널마다 앞뒤 유효 샘플로 선형 보간해 채운 복사본과 결측 마스크를 반환합니다.
+    (양 끝의 결측은 가장 가까운 유효 값으로 채움)
+
+    :param values: (샘플 수,) 또는 (샘플 수, 채널 수) 배열.
+    :return: (채운 배열, 결측 위치 bool 배열).
+    """
+    values = np.array(values, dtype=float)
+    missing = ~np.isfinite(values)
+    if not missing.any():
+        return values, missing
+    columns = values.reshape(len(values), -1)
+    gaps = missing.reshape(len(values), -1)
+    positions = np.arange(len(values))
+    for i in np.flatnonzero(gaps.any(axis=0)):
+        valid = ~gaps[:, i]
+        if not valid.any():
+            raise ValueError(f"Channel {i} has no finite samples to filter.")
+        columns[gaps[:, i], i] = np.interp(positions[gaps[:, i]], positions[valid], columns[valid, i])
+    return values, missing
+
+def zero_phase(values, sos):
+    """
+    영위상(순방향+역방향) 필터를 모든 채널에 한 번에 적용합니다.
+    sosfiltfilt는 NaN 하나로 채널 전체가 NaN이 되므로, 결측 샘플은 보간해 필터링한 뒤 다시 NaN으로 둡니다.
+
+    :param values: (샘플 수,) 또는 (샘플 수, 채널 수) 배열.
+    :param sos: SOS 배열.
+    """
+    values, missing = fill_gaps(values)
+    filtered = sosfiltfilt(sos, values, axis=0)
+    filtered[missing] = np.nan
+    return filtered
+
+def estimate_rate(timestamps):
+    """
+    타임스탬프 간격의 중앙값으로 샘플링 레이트를 추정합니다.
+    """
+    return 1.0 / np.median(np.diff(np.asarray(timestamps, dtype=float)))
+
+class FilterChain:
+    def __init__(self, stages, fs):
+        """
+        여러 필터를 순서대로 적용하는 파이프라인 단계.
+
+        :param stages: (필터 종류, 차단 주파수, 차수) 리스트 (MODALITY_FILTERS 형식).
+        :param fs: 샘플링 레이트 (Hz).
+        """
+        self.stages = list(stages)
+        self.fs = fs
+        sections = [_design(stage, fs) for stage in self.stages]
+        # 직렬 필터는 SOS를 이어 붙이면 하나의 필터로 한 번에 적용할 수 있음
+        self.sos = np.vstack(sections) if sections else np.empty((0, 6))
+
+    @classmethod
+    def for_modality(cls, modality_type, fs):
+        return cls(MODALITY_FILTERS.get(modality_type, []), fs)
+
+    def apply(self, values):
+        """
+        영위상 필터를 적용한 새 배열을 반환합니다.
+        """
+        if len(self.sos) == 0:
+            return np.asarray(values, dtype=float)
+        return zero_phase(values, self.sos)
+
+    def apply_data(self, data):
+        """
+        Data 객체의 모든 채널에 필터 체인을 적용한 복사본을 반환합니다 (원본은 변경하지 않음).
+        """
+        filtered = copy.copy(data)
+        filtered.values = self.apply(data.values)
+        filtered.data = pd.DataFrame(filtered.values, columns=data.column, copy=False)
+        return filtered
+
+    def streaming(self, channels):
+        """
+        같은 필터 체인의 인과(causal) 스트리밍 버전을 반환합니다.
+        """
+        return StreamingFilter(self.sos, channels)
+
+def prefilter(data, fs=None):
+    """
+    모달리티별 기본 필터 체인(MODALITY_FILTERS)을 동기화 전 단계로 적용한 Data 복사본을 반환합니다.
+
+    :param data: Data 객체 (ECG, GSR, PPG).
+    :param fs: 샘플링 레이트 (None이면 타임스탬프로 추정).
+    """
+    fs = estimate_rate(data.time_index.values) if fs is None else fs
+    return FilterChain.for_modality(data.modality_type, fs).apply_data(data)
+
+class StreamingFilter:
+    def __init__(self, sos, channels):
+        """
+        청크 단위로 들어오는 신호에 인과 필터를 적용하고, 필터 상태(zi)를 다음 청크로 넘깁니다.
+        청크로 나누어 처리한 결과는 전체 신호에 sosfilt를 한 번 적용한 결과와 같습니다.
+
+        :param sos: SOS 배열 (design_sos 또는 FilterChain.sos).
+        :param channels: 채널 수.
+        """
+        self.sos = sos
+        self.channels = channels
+        self.zi = None
+
+    def process(self, chunk):
+        """
+        한 청크를 필터링합니다.
+
+        :param chunk: (샘플 수, 채널 수) 배열.
+        :return: 필터링된 (샘플 수, 채널 수) 배열.
+        """
+        chunk = np.asarray(chunk, dtype=float).reshape(-1, self.channels)
+        if len(self.sos) == 0 or len(chunk) == 0:
+            return chunk
+        if self.zi is None:
+            # 첫 샘플 값에서 정상 상태로 시작해 시작 부분의 과도 응답을 줄임
+            self.zi = sosfilt_zi(self.sos)[:, :, None] * chunk[0]
+        filtered, self.zi = sosfilt(self.sos, chunk, axis=0, zi=self.zi)
+        return filtered
+
+    def reset(self):
+        self.zi = None
@@ -0,0 +1,187 @@
+import copy
+import json
+import time
+import threading
+import tracemalloc
+from functools import wraps
+
+class Registry:
+    def __init__(self):
+        """
+        단계별 측정 결과를 프로세스 안에 모아 두는 기본 싱크.
+        같은 이름의 단계는 호출 횟수, 누적/최대 시간, 최대 메모리, 카운터 합계로 합쳐집니다.
+        """
+        self._lock = threading.Lock()
+        self.stages = {}
+
+    def record(self, event):
+        with self._lock:
+            stage = self.stages.setdefault(event['stage'], {
+                'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'peak_mb': None, 'counters': {},
+            })
+            stage['calls'] += 1
+            stage['seconds'] += event['seconds']
+            stage['max_seconds'] = max(stage['max_seconds'], event['seconds'])
+            if event.get('peak_mb') is not None:
+                stage['peak_mb'] = max(stage['peak_mb'] or 0.0, event['peak_mb'])
+            for name, value in event['counters'].items():
+                stage['counters'][name] = stage['counters'].get(name, 0) + value
+
+    def summary(self):
+        """
+        :return: 단계 이름 -> {'calls', 'seconds', 'max_seconds', 'peak_mb', 'counters'} dict (복사본).
+        """
+        with self._lock:
+            return copy.deepcopy(self.stages)
+
+    def report(self):
+        """
+        누적 시간이 긴 순서로 단계별 요약을 출력합니다.
+        """
+        for name, stage in sorted(self.summary().items(), key=lambda item: -item[1]['seconds']):
+            peak = f"{stage['peak_mb']:8.1f} MB" if stage['peak_mb'] is not None else '       - MB'
+            counters = ', '.join(f'{key}={value:g}' for key, value in stage['counters'].items())
+            print(f"{name:<24} {stage['calls']:6d} calls {stage['seconds']:10.4f}s (max {stage['max_seconds']:.4f}s) {peak}  {counters}")
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+
+class JsonLinesSink:
+    def __init__(self, path):
+        """
+        단계가 끝날 때마다 측정 결과를 JSON 한 줄로 파일에 추가하는 싱크.
+
+        :param path: 기록할 .jsonl 파일 경로.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def record(self, event):
+        with self._lock:
+            self._file.write(json.dumps(event, default=str) + '\n')
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+REGISTRY = Registry()
+_sinks = [REGISTRY]
+_local = threading.local()  # 스레드별 진행 중인 단계 스택
+
+def add_sink(sink):
+    """
+    record(event) 메서드를 가진 싱크를 추가합니다.
+    """
+    _sinks.append(sink)
+    return sink
+
+def remove_sink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+def track_memory(enabled=True):
+    """
+    단계별 최대 메모리 측정을 켜거나 끕니다 (tracemalloc 사용, 켜면 실행이 느려짐).
+    """
+    if enabled and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not enabled and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+class Stage:
+    def __init__(self, name, **fields):
+        """
+        with 블록 하나의 소요 시간, 카운터, (track_memory가 켜져 있으면) 최대 메모리를 측정해 싱크에 보냅니다.
+        단계는 중첩할 수 있으며, 이벤트의 'path'에 바깥 단계 이름이 '/'로 이어져 기록됩니다.
+
+        :param name: 단계 이름 (예: 'load', 'parse', 'range_select', 'resample', 'encode', 'write').
+        :param fields: 이벤트에 함께 기록할 값 (예: 파일 이름).
+        """
+        self.name = name
+        self.fields = fields
+        self.counters = {}
+
+    def count(self, name, value=1):
+        """
+        처리한 샘플/프레임 수 같은 카운터를 더합니다.
+        """
+        # numpy 스칼라(np.int64 등)는 JSON으로 기록할 수 없으므로 파이썬 숫자로 변환
+        value = value.item() if hasattr(value, 'item') else value
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def __enter__(self):
+        stack = _stack()
+        self.path = '/'.join([stage.name for stage in stack] + [self.name])
+        self._memory = tracemalloc.is_tracing()
+        if self._memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # 바깥 단계의 최대값을 보존한 뒤 이 단계의 측정을 위해 초기화
+            if stack and stack[-1]._memory:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            self._start_memory = self._peak = current
+        stack.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        seconds = time.perf_counter() - self._start
+        stack = _stack()
+        stack.pop()
+        peak_mb = None
+        if self._memory and tracemalloc.is_tracing():
+            self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            peak_mb = (self._peak - self._start_memory) / 1024 ** 2
+            if stack and stack[-1]._memory:
+                stack[-1]._peak = max(stack[-1]._peak, self._peak)
+        event = {
+            'stage': self.name,
+            'path': self.path,
+            'time': time.time(),
+            'seconds': seconds,
+            'peak_mb': peak_mb,
+            'counters': self.counters,
+            'error': exc_type.__name__ if exc_type is not None else None,
+        }
+        event.update(self.fields)
+        for sink in list(_sinks):
+            sink.record(event)
+        return False
+
+def stage(name, **fields):
+    """
+    측정 단계 컨텍스트 매니저.
+
+        with metrics.stage('resample', target='PPG') as s:
+            ...
+            s.count('samples', len(timestamps))
+    """
+    return Stage(name, **fields)
+
+def timed(name):
+    """
+    함수 호출 전체를 하나의 단계로 측정하는 데코레이터.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with Stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(name, value=1):
+    """
+    현재 진행 중인 단계의 카운터를 더합니다. 진행 중인 단계가 없으면 무시합니다.
+    """
+    stack = _stack()
+    if stack:
+        stack[-1].count(name, value)
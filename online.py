@@ -0,0 +1,203 @@
+import time
+import numpy as np
+
+import sync as sc
+
+class RingBuffer:
+    def __init__(self, capacity, channels, dtype=np.float64):
+        """
+        타임스탬프가 붙은 샘플을 고정 크기로 보관하는 링 버퍼.
+        각 샘플을 두 위치(i, i + capacity)에 기록해 최근 구간을 항상 복사 없는 연속 view로 읽을 수 있습니다.
+
+        :param capacity: 보관할 최대 샘플 수.
+        :param channels: 채널 수.
+        :param dtype: 값 자료형.
+        """
+        self.capacity = capacity
+        self.channels = channels
+        self._timestamps = np.empty(2 * capacity)
+        self._values = np.empty((2 * capacity, channels), dtype=dtype)
+        self._head = 0  # 다음에 기록할 위치 (0 <= head < capacity)
+        self.size = 0
+        self.total = 0  # 지금까지 들어온 전체 샘플 수
+
+    def push(self, timestamps, values):
+        """
+        샘플 묶음을 추가합니다. 용량을 넘으면 가장 오래된 샘플부터 덮어씁니다.
+
+        :param timestamps: (n,) 타임스탬프 배열 (오름차순).
+        :param values: (n, channels) 값 배열.
+        """
+        timestamps = np.atleast_1d(np.asarray(timestamps, dtype=float))
+        values = np.asarray(values).reshape(len(timestamps), self.channels)
+        if len(timestamps) > self.capacity:
+            timestamps, values = timestamps[-self.capacity:], values[-self.capacity:]
+        n = len(timestamps)
+        positions = (self._head + np.arange(n)) % self.capacity
+        for offset in (0, self.capacity):
+            self._timestamps[positions + offset] = timestamps
+            self._values[positions + offset] = values
+        self._head = (self._head + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+        self.total += n
+
+    def view(self):
+        """
+        보관 중인 샘플을 오래된 순서의 연속 view (타임스탬프, 값)로 반환합니다.
+        """
+        start = self._head + self.capacity - self.size
+        stop = self._head + self.capacity
+        return self._timestamps[start:stop], self._values[start:stop]
+
+    @property
+    def latest_time(self):
+        return self._timestamps[self._head + self.capacity - 1] if self.size else -np.inf
+
+class OnlineSynchronizer:
+    def __init__(self, targets, capacity=4096, max_latency=0.2, lookahead=4, kind='cubic', clock=time.perf_counter,
+                 latency_window=65536):
+        """
+        기록 중에 각 모달리티의 샘플을 받아 기준 시계에 맞춰 보간한 결과를 내보내는 실시간 동기화기.
+        보간은 오프라인 interpolate()와 같은 sync.Resampler 스플라인을 링 버퍼 구간에 적용합니다.
+
+        기준 샘플은 모든 대상 신호가 그 시점 이후로 lookahead개 이상의 샘플을 받으면 내보내고,
+        그 전에 max_latency(초)가 지나면 외삽한 값으로 내보내 지연 시간의 상한을 보장합니다.
+
+        :param targets: 대상 이름 -> 채널 이름 리스트 dict.
+        :param capacity: 대상별 링 버퍼 크기 (샘플 수).
+        :param max_latency: 기준 샘플 도착 후 결과를 내보낼 때까지의 최대 지연 (초).
+        :param lookahead: 보간 시점 뒤로 기다릴 대상 샘플 수 (많을수록 오프라인 결과에 가까움).
+        :param kind: 보간 방식 ('linear', 'quadratic', 'cubic').
+        :param clock: 지연 측정에 쓰는 시계 함수 (재생 테스트 시 교체 가능).
+        :param latency_window: 지연 시간 백분위수 계산에 보관할 최근 샘플 수.
+        """
+        self.targets = {name: list(columns) for name, columns in targets.items()}
+        self.columns = [column for columns in self.targets.values() for column in columns]
+        self.buffers = {name: RingBuffer(capacity, len(columns)) for name, columns in self.targets.items()}
+        self.reference = RingBuffer(capacity, 1)  # 값으로 도착 시각을 저장
+        self.max_latency = max_latency
+        self.lookahead = lookahead
+        self.kind = kind
+        self.clock = clock
+        self.emitted_until = -np.inf
+        self.latencies = RingBuffer(latency_window, 1)  # 기준 타임스탬프 -> 지연 시간 (최근 구간만 보관)
+
+    def push_reference(self, timestamps):
+        """
+        기준 신호의 타임스탬프를 추가합니다.
+        """
+        timestamps = np.atleast_1d(np.asarray(timestamps, dtype=float))
+        self.reference.push(timestamps, np.full(len(timestamps), self.clock()))
+
+    def push(self, name, timestamps, values):
+        """
+        대상 신호의 샘플을 추가합니다.
+
+        :param name: 대상 이름.
+        :param timestamps: (n,) 타임스탬프 배열.
+        :param values: (n, 채널 수) 값 배열.
+        """
+        self.buffers[name].push(timestamps, values)
+
+    def _ready_time(self):
+        # 모든 대상이 lookahead개의 뒤쪽 샘플을 확보한 마지막 시점
+        ready = np.inf
+        for buffer in self.buffers.values():
+            timestamps, _ = buffer.view()
+            ready = min(ready, timestamps[-1 - self.lookahead] if len(timestamps) > self.lookahead else -np.inf)
+        return ready
+
+    def poll(self):
+        """
+        내보낼 준비가 된 기준 시점들의 보간 결과를 반환합니다.
+
+        :return: (기준 타임스탬프 배열, (시점 수, 전체 채널 수) 값 배열). 내보낼 것이 없으면 빈 배열.
+        """
+        now = self.clock()
+        timestamps, arrivals = self.reference.view()
+        pending = np.searchsorted(timestamps, self.emitted_until, side='right')
+        timestamps, arrivals = timestamps[pending:], arrivals[pending:, 0]
+        # 준비된 시점까지, 또는 지연 상한을 넘긴 시점까지 내보냄
+        ready = (timestamps <= self._ready_time()) | (arrivals + self.max_latency <= now)
+        count = len(ready) if ready.all() else int(np.argmin(ready))
+        # 지연 상한을 넘긴 시점이 뒤에 있으면 그 앞의 시점도 함께 내보냄 (순서 유지)
+        overdue = np.flatnonzero(arrivals + self.max_latency <= now)
+        if len(overdue):
+            count = max(count, int(overdue[-1]) + 1)
+        query = np.array(timestamps[:count])
+        if count == 0:
+            return query, np.empty((0, len(self.columns)))
+
+        values = np.full((count, len(self.columns)), np.nan)
+        offset = 0
+        for name, buffer in self.buffers.items():
+            width = len(self.targets[name])
+            target_timestamps, target_values = buffer.view()
+            if len(target_timestamps) > sc.SPLINE_ORDERS[self.kind]:
+                values[:, offset:offset + width] = self._resample(target_timestamps, target_values, query)
+            offset += width
+
+        self.emitted_until = query[-1]
+        emitted_at = self.clock()
+        self.latencies.push(query, emitted_at - arrivals[:count])
+        return query, values
+
+    def _resample(self, timestamps, values, query):
+        # 질의 구간 앞쪽은 스플라인 경계 영향이 충분히 줄어들 만큼만 사용
+        start = max(0, int(np.searchsorted(timestamps, query[0])) - 32)
+        return sc.Resampler(timestamps[start:], values[start:], kind=self.kind).resample(query)
+
+    def latency_percentiles(self, percentiles=(50, 90, 95, 99)):
+        """
+        최근 latency_window개의 내보낸 샘플에 대한 종단 간 지연 시간 백분위수 (초).
+        """
+        if not self.latencies.size:
+            return {}
+        return dict(zip(percentiles, np.percentile(self.latencies.view()[1][:, 0], percentiles)))
+
+def replay(synchronizer, reference_timestamps, targets, speed=1.0, step=0.02):
+    """
+    저장된 기록을 실시간(또는 speed배 빠르게) 재생하며 동기화기에 샘플을 넣고 결과를 모읍니다.
+
+    :param synchronizer: OnlineSynchronizer.
+    :param reference_timestamps: 기준 신호 타임스탬프 배열.
+    :param targets: 대상 이름 -> (타임스탬프 배열, 값 배열) dict (예: Data.time_index.values, Data.values).
+    :param speed: 재생 속도 배수. None이면 기다리지 않고 최대 속도로 재생.
+    :param step: 한 번에 넣을 기록 시간 간격 (초).
+    :return: (기준 타임스탬프 배열, 값 배열, 지연 시간 백분위수 dict).
+    """
+    reference_timestamps = np.asarray(reference_timestamps, dtype=float)
+    start = min([reference_timestamps[0]] + [np.asarray(timestamps)[0] for timestamps, _ in targets.values()])
+    end = max([reference_timestamps[-1]] + [np.asarray(timestamps)[-1] for timestamps, _ in targets.values()])
+    positions = {name: 0 for name in targets}
+    reference_position = 0
+    outputs_t, outputs_v = [], []
+    started = time.perf_counter()
+
+    for cursor in np.arange(start + step, end + 2 * step, step):
+        for name, (timestamps, values) in targets.items():
+            stop = int(np.searchsorted(timestamps, cursor, side='right'))
+            if stop > positions[name]:
+                synchronizer.push(name, timestamps[positions[name]:stop], values[positions[name]:stop])
+                positions[name] = stop
+        stop = int(np.searchsorted(reference_timestamps, cursor, side='right'))
+        if stop > reference_position:
+            synchronizer.push_reference(reference_timestamps[reference_position:stop])
+            reference_position = stop
+
+        emitted_t, emitted_v = synchronizer.poll()
+        outputs_t.append(emitted_t)
+        outputs_v.append(emitted_v)
+
+        if speed is not None:
+            delay = (cursor - start) / speed - (time.perf_counter() - started)
+            if delay > 0:
+                time.sleep(delay)
+
+    # 남은 기준 시점은 지연 상한을 기다리지 않고 모두 내보냄
+    max_latency, synchronizer.max_latency = synchronizer.max_latency, -np.inf
+    emitted_t, emitted_v = synchronizer.poll()
+    synchronizer.max_latency = max_latency
+    outputs_t.append(emitted_t)
+    outputs_v.append(emitted_v)
+    return np.concatenate(outputs_t), np.concatenate(outputs_v), synchronizer.latency_percentiles()
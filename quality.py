@@ -0,0 +1,105 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from skimage.metrics import structural_similarity
+
+def _chunk_metrics(original, test, data_range, ssim):
+    """
+    (n, H, W, C) 프레임 묶음 두 개의 프레임별 MSE, PSNR, (선택) SSIM을 계산.
+    차이를 정수로 계산하므로 MSE는 정확한 값이며, PSNR은 skimage의 peak_signal_noise_ratio와 같습니다.
+    """
+    difference = original.astype(np.int32) - test.astype(np.int32)
+    squared = (difference * difference).reshape(len(difference), -1)
+    mse = squared.sum(axis=1, dtype=np.int64) / squared.shape[1]
+    with np.errstate(divide='ignore'):
+        psnr = 10 * np.log10(data_range ** 2 / mse)
+    ssim_values = None
+    if ssim:
+        ssim_values = np.array([
+            structural_similarity(a, b, data_range=data_range, channel_axis=-1 if a.ndim == 3 else None)
+            for a, b in zip(original, test)
+        ])
+    return mse, psnr, ssim_values
+
+def _iter_pairs(original_frames, test_frames, chunk_size):
+    """
+    두 프레임 소스에서 chunk_size개씩 (위치, 원본 묶음, 비교 묶음)을 만듭니다.
+    numpy 배열이 아닌 프레임(예: 허용 오차를 넘어 None인 프레임)은 건너뜁니다.
+    """
+    pairs = enumerate(zip(original_frames, test_frames))
+    while True:
+        chunk = list(islice(pairs, chunk_size))
+        if not chunk:
+            return
+        valid = [(i, a, b) for i, (a, b) in chunk if isinstance(a, np.ndarray) and isinstance(b, np.ndarray)]
+        yield (
+            [i for i, _, _ in valid],
+            np.stack([a for _, a, _ in valid]) if valid else None,
+            np.stack([b for _, _, b in valid]) if valid else None,
+            chunk[-1][0] + 1,
+        )
+
+def frame_quality(original_frames, test_frames, chunk_size=32, ssim=False, workers=None, data_range=255):
+    """
+    두 프레임 시퀀스의 프레임별 화질 지표를 묶음 단위 벡터 연산으로 계산.
+    리스트, 배열, VideoLoader 같은 지연 프레임 소스를 모두 받으며 한 번에 chunk_size개 프레임만 메모리에 올립니다.
+
+    :param original_frames: 원본 프레임 시퀀스.
+    :param test_frames: 비교할 프레임 시퀀스 (예: 동기화된 보간 프레임).
+    :param chunk_size: 한 번에 처리할 프레임 수.
+    :param ssim: True이면 SSIM도 계산 (느림).
+    :param workers: 프로세스 수. None 또는 1이면 현재 프로세스에서 계산.
+    :param data_range: 픽셀 값 범위.
+    :return: {'mse', 'psnr', 'ssim'} 프레임별 배열(유효하지 않은 프레임은 NaN)과 'summary' 통계 dict.
+    """
+    indices, results, total = [], [], 0
+    if workers is None or workers <= 1:
+        for chunk_indices, original, test, total in _iter_pairs(original_frames, test_frames, chunk_size):
+            if chunk_indices:
+                indices.append(chunk_indices)
+                results.append(_chunk_metrics(original, test, data_range, ssim))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = []
+            for chunk_indices, original, test, total in _iter_pairs(original_frames, test_frames, chunk_size):
+                if chunk_indices:
+                    indices.append(chunk_indices)
+                    pending.append(executor.submit(_chunk_metrics, original, test, data_range, ssim))
+                # 처리 중인 묶음 수를 제한해 메모리 사용량을 일정하게 유지
+                while len(pending) >= 2 * workers:
+                    results.append(pending.pop(0).result())
+            results.extend(future.result() for future in pending)
+
+    metrics = {name: np.full(total, np.nan) for name in ('mse', 'psnr', 'ssim')}
+    for chunk_indices, (mse, psnr, ssim_values) in zip(indices, results):
+        metrics['mse'][chunk_indices] = mse
+        metrics['psnr'][chunk_indices] = psnr
+        if ssim_values is not None:
+            metrics['ssim'][chunk_indices] = ssim_values
+    if not ssim:
+        metrics['ssim'] = None
+    metrics['summary'] = summarize(metrics, total)
+    return metrics
+
+def summarize(metrics, total):
+    """
+    프레임별 지표의 요약 통계 (평균, 중앙값, 표준편차, 최소, 최대).
+    PSNR의 통계는 동일한 프레임(무한대)을 제외하고 계산합니다.
+    """
+    valid = ~np.isnan(metrics['mse'])
+    summary = {'frames': total, 'valid': int(valid.sum()), 'identical': int(np.sum(metrics['mse'][valid] == 0))}
+    for name in ('mse', 'psnr', 'ssim'):
+        values = metrics[name]
+        if values is None:
+            continue
+        values = values[valid & np.isfinite(values)]
+        if len(values) == 0:
+            continue
+        summary[name] = {
+            'mean': float(np.mean(values)),
+            'median': float(np.median(values)),
+            'std': float(np.std(values)),
+            'min': float(np.min(values)),
+            'max': float(np.max(values)),
+        }
+    return summary
@@ -1,30 +1,40 @@
+import os
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
-from scipy.signal import butter, filtfilt, welch
+import signal_store as ss
+import filters
 
 
 def lowpass_filter(data, highcut=5.0, fs=128, order=5):
     """
     Applies a Butterworth lowpass filter with the given highcut frequency.
+    The SOS design is cached in filters.design_sos, and 2-D input is filtered across all columns at once.
     """
-    nyquist = 0.5 * fs  # 나이퀴스트 주파수 계산
-    high = highcut / nyquist
-    b, a = butter(order, high, btype='low')  # 저역 필터 계수 계산
-    filtered_data = filtfilt(b, a, data)  # 필터 적용
+    sos = filters.design_sos('lowpass', highcut, order, fs)  # 저역 필터 계수 (캐시됨)
+    filtered_data = filters.zero_phase(data, sos)  # 필터 적용
     return filtered_data
 
 
-# 데이터 읽기
-file_path = r'C:\Users\이동혁\Desktop\vidcap\Data_Synchronization\interpolated_signals\interp_GSR_2_ECG.csv'
-# df = pd.read_csv(file_path, skiprows=[0, 2], sep='\t', low_memory=False)
-df = pd.read_csv(file_path)
+def read_signal_file(file_path, start=500, stop=3500):
+    """
+    Reads rows [start, stop) of an interpolated signal file (.sig store or CSV).
+    """
+    if ss.is_signal_store(file_path):
+        # 바이너리 저장소는 메모리 맵으로 필요한 행만 읽음
+        return ss.read_signals(file_path, start, stop)
+    # df = pd.read_csv(file_path, skiprows=[0, 2], sep='\t', low_memory=False)
+    df = pd.read_csv(file_path)
+    return df[start:stop].copy()
+
 
-df = df[500:3500].copy()
+# 데이터 읽기 (경로는 명령행 인자로 지정, 예: python read_csv.py interpolated_signals/interp_GSR_2_ECG.sig)
+file_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join('interpolated_signals', 'interp_GSR_2_ECG.csv')
+df = read_signal_file(file_path)
 
 
 # conductance_columns = [col for col in df.columns if 'id95AE_GSR_Skin_Conductance_CAL' in col]
-# for col in conductance_columns:
-#     df[col] = lowpass_filter(df[col], highcut=5.0, fs=128, order=5)
+# df[conductance_columns] = lowpass_filter(df[conductance_columns], highcut=5.0, fs=filters.estimate_rate(df.index), order=5)
 
 
 
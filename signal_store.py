@@ -0,0 +1,215 @@
+import os
+import json
+import shutil
+import numpy as np
+import pandas as pd
+
+# 동기화 결과를 저장하는 바이너리 컬럼 형식.
+# <이름>.sig/ 디렉토리에 타임스탬프와 채널을 각각 raw little-endian 파일로 저장하고,
+# 컬럼 이름, 단위, 원본/기준 파일 정보는 meta.json에 기록합니다.
+# 행 수를 미리 알 때는 모든 채널을 하나의 열 우선(Fortran) (행 수, 채널 수) 파일로 저장할 수 있습니다 (matrix 형식).
+STORE_SUFFIX = '.sig'
+META_FILE = 'meta.json'
+TIMESTAMP_FILE = 'timestamp.bin'
+MATRIX_FILE = 'values.bin'
+
+def is_signal_store(path):
+    return path.endswith(STORE_SUFFIX)
+
+class SignalWriter:
+    def __init__(self, path, columns, units=None, source=None, reference=None, dtype=np.float64, capacity=None):
+        """
+        동기화 결과를 청크 단위로 이어 쓰는 바이너리 컬럼 저장기.
+        텍스트 변환 없이 배열을 그대로 기록하므로 쓰기 속도는 I/O에 의해 결정됩니다.
+        capacity를 지정하면 (capacity, 채널 수) 열 우선 메모리 맵 하나에 기록하며(matrix 형식),
+        SignalReader.values로 전체 채널을 하나의 2차원 배열 view로 읽을 수 있습니다.
+
+        :param path: 저장할 디렉토리 경로 ('.sig'로 끝나야 함).
+        :param columns: 채널 이름 리스트.
+        :param units: 채널 이름 -> 단위 dict (선택적).
+        :param source: 보간 대상 신호 정보 (예: 파일 이름, 모달리티).
+        :param reference: 보간 기준 신호 정보.
+        :param dtype: 채널 데이터 자료형 (타임스탬프는 항상 float64).
+        :param capacity: 기록할 최대 행 수 (matrix 형식, 선택적).
+        """
+        if not is_signal_store(path):
+            raise ValueError(f"Signal store path must end with '{STORE_SUFFIX}': {path}")
+        self.path = path
+        # 임시 디렉토리에 기록한 뒤 close()에서 교체하므로, 기존 저장소는 완성된 결과로만 바뀜
+        self.temp_path = path + '.tmp' + STORE_SUFFIX
+        shutil.rmtree(self.temp_path, ignore_errors=True)
+        os.makedirs(self.temp_path)
+        path = self.temp_path
+        self.columns = list(columns)
+        self.dtype = np.dtype(dtype).newbyteorder('<')
+        self.meta = {
+            'columns': self.columns,
+            'units': dict(units or {}),
+            'source': source,
+            'reference': reference,
+            'dtype': self.dtype.str,
+            'rows': 0,
+        }
+        if capacity is not None:
+            # 빈 파일은 메모리 맵을 만들 수 없으므로 최소 한 행을 확보
+            capacity = max(int(capacity), 1)
+            self.meta.update({'layout': 'matrix', 'capacity': capacity})
+            self._timestamps = np.memmap(os.path.join(path, TIMESTAMP_FILE), dtype='<f8', mode='w+', shape=(capacity,))
+            self._values = np.memmap(os.path.join(path, MATRIX_FILE), dtype=self.dtype, mode='w+',
+                                     shape=(capacity, len(self.columns)), order='F')
+            return
+        self._values = None
+        self._timestamp_file = open(os.path.join(path, TIMESTAMP_FILE), 'wb')
+        self._column_files = [open(os.path.join(path, column_file_name(i)), 'wb') for i in range(len(self.columns))]
+
+    def write(self, timestamps, values):
+        """
+        한 청크를 이어 씁니다.
+
+        :param timestamps: (행 수,) 타임스탬프 배열.
+        :param values: (행 수, 채널 수) 값 배열.
+        """
+        timestamps = np.asarray(timestamps, dtype='<f8')
+        values = np.asarray(values).reshape(len(timestamps), len(self.columns))
+        if self._values is not None:
+            start, stop = self.meta['rows'], self.meta['rows'] + len(timestamps)
+            if stop > self.meta['capacity']:
+                raise ValueError(f"Signal store capacity ({self.meta['capacity']} rows) exceeded: {self.path}")
+            self._timestamps[start:stop] = timestamps
+            self._values[start:stop] = values
+            self.meta['rows'] = stop
+            return
+        self._timestamp_file.write(timestamps.tobytes())
+        for i, file in enumerate(self._column_files):
+            file.write(np.ascontiguousarray(values[:, i], dtype=self.dtype).tobytes())
+        self.meta['rows'] += len(timestamps)
+
+    def _close_files(self):
+        if self._values is not None:
+            self._timestamps.flush()
+            self._values.flush()
+            self._timestamps = self._values = None
+        else:
+            for file in [self._timestamp_file] + self._column_files:
+                file.close()
+
+    def close(self):
+        """
+        파일을 닫고 meta.json을 기록한 뒤 임시 디렉토리를 최종 경로로 교체합니다.
+        """
+        self._close_files()
+        # meta.json은 마지막에 기록하므로, 중간에 실패한 저장소는 읽을 수 없음
+        with open(os.path.join(self.temp_path, META_FILE), 'w', encoding='utf-8') as file:
+            json.dump(self.meta, file, indent=2, ensure_ascii=False)
+        shutil.rmtree(self.path, ignore_errors=True)
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        """
+        기록을 중단하고 임시 디렉토리를 지웁니다. 기존 저장소는 그대로 남습니다.
+        """
+        self._close_files()
+        shutil.rmtree(self.temp_path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
+
+def column_file_name(index):
+    return f'ch{index:03d}.bin'
+
+def write_signals(path, frame, units=None, source=None, reference=None):
+    """
+    타임스탬프 인덱스를 가진 DataFrame을 바이너리 컬럼 형식으로 저장합니다.
+
+    :param path: 저장할 디렉토리 경로 ('.sig'로 끝나야 함).
+    :param frame: 인덱스가 타임스탬프인 DataFrame (interpolate / SyncSession 결과).
+    """
+    units = {column: unit for column, unit in (units or {}).items() if column in frame.columns}
+    with SignalWriter(path, frame.columns, units=units, source=source, reference=reference) as writer:
+        writer.write(frame.index.to_numpy(dtype=float), frame.to_numpy())
+
+class SignalReader:
+    def __init__(self, path):
+        """
+        바이너리 컬럼 저장소를 메모리 맵으로 엽니다. 파일을 미리 읽지 않으므로
+        행 범위나 일부 채널만 읽을 때는 해당 부분만 디스크에서 읽힙니다.
+        matrix 형식이면 values가 (행 수, 채널 수) 메모리 맵 view이며, 채널은 열 우선으로 저장되어
+        일부 채널만 읽을 때 다른 채널의 데이터는 읽지 않습니다.
+
+        :param path: '.sig' 디렉토리 경로.
+        """
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"Signal store metadata not found: {meta_path}")
+        with open(meta_path, 'r', encoding='utf-8') as file:
+            self.meta = json.load(file)
+        self.path = path
+        self.columns = self.meta['columns']
+        self.units = self.meta['units']
+        self.rows = self.meta['rows']
+        self.values = None
+        self._channels = {}
+        if self.meta.get('layout') == 'matrix':
+            capacity = self.meta['capacity']
+            self.timestamps = np.memmap(os.path.join(path, TIMESTAMP_FILE), dtype='<f8', mode='r', shape=(capacity,))[:self.rows]
+            self.values = np.memmap(os.path.join(path, MATRIX_FILE), dtype=self.meta['dtype'], mode='r',
+                                    shape=(capacity, len(self.columns)), order='F')[:self.rows]
+        else:
+            self.timestamps = self._map(TIMESTAMP_FILE, '<f8')
+
+    def _map(self, file_name, dtype):
+        if self.rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, file_name), dtype=dtype, mode='r', shape=(self.rows,))
+
+    def matrix(self, columns=None):
+        """
+        선택한 채널을 (행 수, 채널 수) 배열로 반환합니다.
+        matrix 형식에서 연속한 채널 범위는 복사 없는 view이고, 그 외에는 선택한 채널만 읽어 복사합니다.
+
+        :param columns: 채널 이름 리스트 (None이면 전체).
+        """
+        indices = list(range(len(self.columns))) if columns is None else [self.columns.index(column) for column in columns]
+        if self.values is None:
+            return np.column_stack([self.channel(self.columns[index]) for index in indices])
+        if indices and indices == list(range(indices[0], indices[-1] + 1)):
+            return self.values[:, indices[0]:indices[-1] + 1]
+        return self.values[:, indices]
+
+    def channel(self, column):
+        """
+        한 채널의 메모리 맵 배열을 반환합니다.
+        """
+        if self.values is not None:
+            return self.values[:, self.columns.index(column)]
+        if column not in self._channels:
+            self._channels[column] = self._map(column_file_name(self.columns.index(column)), self.meta['dtype'])
+        return self._channels[column]
+
+    def read(self, start=None, stop=None, columns=None):
+        """
+        [start, stop) 행 범위의 선택한 채널을 DataFrame으로 읽습니다.
+
+        :param start: 시작 행 (None이면 처음부터).
+        :param stop: 끝 행 (None이면 끝까지).
+        :param columns: 읽을 채널 이름 리스트 (None이면 전체).
+        :return: 타임스탬프 인덱스를 가진 DataFrame.
+        """
+        rows = slice(start, stop)
+        columns = self.columns if columns is None else list(columns)
+        return pd.DataFrame(
+            {column: np.array(self.channel(column)[rows]) for column in columns},
+            index=pd.Index(np.array(self.timestamps[rows]), name='timestamp'),
+        )
+
+def read_signals(path, start=None, stop=None, columns=None):
+    """
+    바이너리 컬럼 저장소에서 [start, stop) 행 범위를 DataFrame으로 읽습니다.
+    """
+    return SignalReader(path).read(start, stop, columns)
@@ -1,47 +1,334 @@
 import numpy as np
 import pandas as pd
-from scipy.interpolate import interp1d
-from scipy.interpolate import CubicSpline
+from scipy.interpolate import make_interp_spline
+from scipy.signal import resample_poly
+from fractions import Fraction
 
-def interpolate_1Dsignals(df, target_rate):
+import metrics
+
+def uniform_grid(start_time, end_time, target_rate):
+    """
+    start_time부터 end_time까지 1 / target_rate 간격의 균일한 시간축.
+    """
+    count = int(np.floor((end_time - start_time) * target_rate + 1e-9)) + 1
+    return start_time + np.arange(count) / target_rate
+
+def _numeric_columns(df, columns):
+    """
+    채널 컬럼을 (샘플 수, 채널 수) float 배열로 변환. 이미 숫자형인 컬럼은 복사 없이 사용하고,
+    문자열 컬럼(Shimmer 내보내기의 빈 문자열 등)만 pd.to_numeric으로 한 번에 변환해 NaN으로 만듭니다.
+    """
+    arrays = []
+    for column in columns:
+        series = df[column]
+        if not pd.api.types.is_numeric_dtype(series):
+            series = pd.to_numeric(series, errors='coerce')
+        arrays.append(series.to_numpy(dtype=float))
+    return np.column_stack(arrays) if arrays else np.empty((len(df), 0))
+
+def interpolate_1Dsignals(df, target_rate, kind='cubic', out=None):
  
     """
     유닉스 타임스탬프와 생체신호호 데이터를 샘플링 레이트 기반으로 보간.
+    신호 자신의 시작~끝 시간으로 target_rate 간격의 균일한 시간축을 만들고, 모든 채널을 한 번에 보간합니다.
+    NaN(빈 문자열) 샘플은 제외하고 보간하며, NaN 위치가 같은 채널끼리는 보간 함수 하나를 공유합니다.
+
+    :param df: 'timestamp' 컬럼(없으면 인덱스를 타임스탬프로 사용)과 채널 컬럼을 가진 DataFrame.
+    :param target_rate: 목표 샘플링 레이트 (Hz).
+    :param kind: 보간 방식 ('linear', 'quadratic', 'cubic').
+    :param out: 결과를 기록할 (시간축 길이, 채널 수) float64 배열 (선택적).
+    :return: 균일한 시간축으로 보간된 DataFrame (입력과 같은 타임스탬프 배치).
     """
+    has_timestamp_column = 'timestamp' in df.columns
+    timestamps = (df['timestamp'] if has_timestamp_column else df.index).to_numpy(dtype=float)
+    if len(timestamps) < 2:
+        raise ValueError(f"At least two samples are required to interpolate, got {len(timestamps)}.")
+    columns = [column for column in df.columns if column != 'timestamp']
+    values = _numeric_columns(df, columns)
+
+    grid = uniform_grid(timestamps[0], timestamps[-1], target_rate)
+    shape = (len(grid), len(columns))
+    if out is None:
+        out = np.empty(shape)
+    elif out.shape != shape or out.dtype != np.float64:
+        raise ValueError(f"Output buffer must be float64 with shape {shape}, got {out.dtype} {out.shape}.")
+
+    # NaN 패턴이 같은 채널끼리 묶어 보간 함수 하나로 처리 (대부분 모든 채널이 한 묶음)
+    finite = np.isfinite(values)
+    patterns = {}
+    for channel in range(len(columns)):
+        patterns.setdefault(finite[:, channel].tobytes(), []).append(channel)
+    for channels in patterns.values():
+        rows = finite[:, channels[0]]
+        if rows.sum() <= SPLINE_ORDERS[kind]:
+            out[:, channels] = np.nan
+            continue
+        resampler = Resampler(timestamps[rows], values[rows][:, channels], kind=kind)
+        out[:, channels] = resampler.resample(grid)
 
+    interpolated_df = pd.DataFrame(out, columns=columns, copy=False)
+    if has_timestamp_column:
+        interpolated_df.insert(0, 'timestamp', grid)
+    else:
+        interpolated_df.index = pd.Index(grid, name='timestamp')
     return interpolated_df
 
-def interpolate_video(timestamps, frame_data, sampling_rate):
+def frame_blend_weights(timestamps, query_timestamps):
+    """
+    각 보간 시점에 대해 앞뒤로 감싸는 두 프레임의 인덱스와 혼합 가중치를 한 번에 계산.
+
+    :param timestamps: 원본 프레임 타임스탬프 (오름차순).
+    :param query_timestamps: 보간할 타임스탬프 (오름차순).
+    :return: (앞 프레임 인덱스 배열, 뒤 프레임 가중치 배열). 보간값 = (1 - w) * frame[i] + w * frame[i + 1].
+    """
+    timestamps = np.asarray(timestamps, dtype=float)
+    query_timestamps = np.asarray(query_timestamps, dtype=float)
+    lower = np.clip(np.searchsorted(timestamps, query_timestamps, side='right') - 1, 0, len(timestamps) - 2)
+    span = timestamps[lower + 1] - timestamps[lower]
+    # 타임스탬프가 중복된 구간은 앞 프레임을 그대로 사용
+    weights = np.divide(query_timestamps - timestamps[lower], span, out=np.zeros_like(span), where=span > 0)
+    return lower, weights
+
+@metrics.timed('interpolate_video')
+def interpolate_video(timestamps, frame_data, sampling_rate, out=None, output_path=None, chunk_size=16, writer=None):
     """
     유닉스 타임스탬프와 프레임 데이터를 샘플링 레이트 기반으로 보간 (uint8).
+    픽셀마다 보간 함수를 만들지 않고, 보간 시점마다 앞뒤 두 프레임 전체를 가중 혼합합니다.
+    원본 프레임은 한 번에 두 장만 읽으므로 VideoLoader 같은 지연 프레임 소스도 그대로 사용할 수 있습니다.
+
+    :param timestamps: 원본 프레임 타임스탬프.
+    :param frame_data: 원본 프레임 시퀀스 (리스트, 배열 또는 VideoLoader).
+    :param sampling_rate: 보간 샘플링 레이트 (Hz).
+    :param out: 결과를 기록할 (total_samples, H, W, C) uint8 배열 (선택적).
+    :param output_path: out이 없을 때 결과를 기록할 .npy 메모리 맵 파일 경로 (선택적).
+    :param chunk_size: 한 번에 혼합할 최대 보간 프레임 수.
+    :param writer: 혼합한 묶음을 바로 넘길 프레임 기록기 (예: vidcap.FrameWriter, 선택적).
+                   out과 output_path가 없으면 전체 배열을 만들지 않고 chunk_size개 프레임 버퍼만 사용합니다.
+    :return: 보간된 타임스탬프 리스트와 보간된 프레임 배열 (writer만 사용한 경우 None).
     """
-    # 입력 데이터를 numpy 배열로 변환
-    timestamps = np.array(timestamps)
-    frame_data = np.array(frame_data, dtype=np.uint8)  # uint8 타입으로 변환
+    timestamps = np.asarray(timestamps, dtype=float)
 
     # 보간할 총 샘플 수 계산
     total_samples = int((timestamps[-1] - timestamps[0]) * sampling_rate)
 
     # 보간된 타임스탬프 생성
     interpolated_timestamps = np.linspace(timestamps[0], timestamps[-1], total_samples)
+    metrics.count('source_frames', len(timestamps))
+    metrics.count('frames', total_samples)
+    lower, weights = frame_blend_weights(timestamps, interpolated_timestamps)
 
     # 보간된 프레임 데이터를 저장할 배열 생성
-    height, width, channels = frame_data.shape[1:]  # 영상 해상도 및 채널 정보 추출
-    interpolated_frames = np.empty((total_samples, height, width, channels), dtype=np.uint8)
+    shape = (total_samples,) + np.asarray(frame_data[0]).shape  # 영상 해상도 및 채널 정보
+    buffer = None
+    if out is None and output_path is None and writer is not None:
+        buffer = np.empty((chunk_size,) + shape[1:], dtype=np.uint8)  # 기록기로 넘기기 전 재사용하는 묶음 버퍼
+    elif out is None:
+        if output_path is not None:
+            out = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.uint8, shape=shape)
+        else:
+            out = np.empty(shape, dtype=np.uint8)
+    elif out.shape != shape or out.dtype != np.uint8:
+        raise ValueError(f"Output buffer must be uint8 with shape {shape}, got {out.dtype} {out.shape}.")
+
+    # lower는 오름차순이므로 같은 프레임 쌍을 쓰는 보간 시점은 연속된 구간
+    pairs, starts = np.unique(lower, return_index=True)
+    stops = np.append(starts[1:], total_samples)
+    for pair, pair_start, pair_stop in zip(pairs, starts, stops):
+        previous = np.asarray(frame_data[pair], dtype=np.float32)
+        difference = np.asarray(frame_data[pair + 1], dtype=np.float32) - previous
+        for chunk_start in range(pair_start, pair_stop, chunk_size):
+            chunk_stop = min(chunk_start + chunk_size, pair_stop)
+            chunk_weights = weights[chunk_start:chunk_stop].astype(np.float32)[:, None, None, None]
+            target = buffer[:chunk_stop - chunk_start] if buffer is not None else out[chunk_start:chunk_stop]
+            target[...] = np.clip(previous + chunk_weights * difference, 0, 255)
+            if writer is not None:
+                writer.write_chunk(target, interpolated_timestamps[chunk_start:chunk_stop])
+
+    if isinstance(out, np.memmap):
+        out.flush()
+
+    return interpolated_timestamps.tolist(), out
+
+def align_nearest(reference_timestamps, target_timestamps, tolerance=None):
+    """
+    정렬된 두 타임스탬프 열에서 reference 각 시점과 가장 가까운 target 시점을 이진 탐색으로 찾음.
+    프레임이든 센서 샘플이든 인덱스만 계산하므로 데이터를 복사하지 않습니다.
 
-    # 각 RGB 채널별로 보간 수행
-    for channel in range(channels):
-        print(f"Processing channel {channel + 1}/{channels}...")  # 상태 출력
-        channel_data = frame_data[..., channel]  # 해당 채널 데이터 추출 (N, H, W)
-        interpolated_channel = np.empty((total_samples, height, width), dtype=np.uint8)
+    :param reference_timestamps: 기준 타임스탬프 (오름차순).
+    :param target_timestamps: 검색 대상 타임스탬프 (오름차순).
+    :param tolerance: 허용 오차 (초). None이면 모든 시점을 일치로 간주.
+    :return: (가장 가까운 target 인덱스, 부호 있는 오프셋 target - reference, 허용 오차 이내 여부 마스크).
+    """
+    reference_timestamps = np.asarray(reference_timestamps, dtype=float)
+    target_timestamps = np.asarray(target_timestamps, dtype=float)
+    if len(target_timestamps) == 0:
+        raise ValueError("target_timestamps must not be empty.")
+
+    right = np.clip(np.searchsorted(target_timestamps, reference_timestamps), 1, len(target_timestamps) - 1)
+    left = right - 1
+    if len(target_timestamps) == 1:
+        right = left = np.zeros_like(right)
+    # 거리가 같으면 앞쪽 인덱스를 선택 (np.argmin과 동일)
+    use_right = np.abs(target_timestamps[right] - reference_timestamps) < np.abs(target_timestamps[left] - reference_timestamps)
+    indices = np.where(use_right, right, left)
+    offsets = target_timestamps[indices] - reference_timestamps
+    matched = np.ones(len(indices), dtype=bool) if tolerance is None else np.abs(offsets) <= tolerance
+    return indices, offsets, matched
+
+SPLINE_ORDERS = {'linear': 1, 'slinear': 1, 'quadratic': 2, 'cubic': 3}
+
+class Resampler:
+    def __init__(self, timestamps, values, kind='cubic'):
+        """
+        스플라인 계수를 미리 계산해 두고 임의의 시점 집합에 대해 반복 평가하는 보간기.
+        interp1d(kind=..., fill_value='extrapolate')와 같은 not-a-knot 스플라인을 사용하며,
+        평가 시에는 질의 시점이 속한 구간의 계수만 사용합니다.
+
+        :param timestamps: 원본 타임스탬프 (오름차순).
+        :param values: 원본 값 (시점 수,) 또는 (시점 수, 채널 수) 배열.
+        :param kind: 보간 방식 ('linear', 'quadratic', 'cubic').
+        """
+        if kind not in SPLINE_ORDERS:
+            raise ValueError(f"Unsupported interpolation kind: {kind}")
+        self.kind = kind
+        self.timestamps = np.asarray(timestamps, dtype=float)
+        self.spline = make_interp_spline(
+            self.timestamps,
+            np.asarray(values, dtype=float),
+            k=SPLINE_ORDERS[kind],
+            axis=0,
+            check_finite=False,
+        )
+
+    def resample(self, times):
+        """
+        질의 시점에서의 보간값을 반환 (범위 밖은 외삽).
+
+        :param times: 질의 시점 배열.
+        :return: (질의 시점 수, 채널 수) 배열 (1차원 입력이면 1차원).
+        """
+        return self.spline(np.asarray(times, dtype=float), extrapolate=True)
+
+    __call__ = resample
+
+def estimate_sampling(timestamps, tolerance=0.1):
+    """
+    타임스탬프 간격으로 샘플링 레이트와 지터를 추정하고, 균일하지 않은 간격(누락, 지터)을 찾음.
+
+    :param timestamps: 타임스탬프 배열 (초).
+    :param tolerance: 중앙값 간격 대비 허용하는 상대 편차.
+    :return: {'rate', 'jitter'(간격 표준편차, 초), 'relative_jitter', 'irregular'(불규칙 간격의 시작 인덱스)} dict.
+    """
+    intervals = np.diff(np.asarray(timestamps, dtype=float))
+    median = np.median(intervals)
+    irregular = np.flatnonzero(np.abs(intervals / median - 1) > tolerance)
+    regular = np.delete(intervals, irregular)
+    jitter = float(np.std(regular)) if len(regular) else float('nan')
+    return {
+        'rate': 1.0 / median,
+        'jitter': jitter,
+        'relative_jitter': jitter / median,
+        'irregular': irregular,
+    }
+
+def _polyphase_segment(values, up, down, chunk_size):
+    """
+    균일 구간 하나를 청크 단위로 polyphase 리샘플링. 청크는 down의 배수 위치에서 나누고
+    FIR 필터 길이만큼 앞뒤로 겹쳐 읽으므로 결과는 구간 전체를 한 번에 처리한 것과 같습니다.
+    """
+    n = len(values)
+    # 구간 양 끝을 잇는 직선을 빼고 처리한 뒤 다시 더함 (padtype='line'과 동일한 가장자리 처리)
+    line = values[0] + np.multiply.outer(np.arange(n) / max(n - 1, 1), values[-1] - values[0])
+    detrended = values - line
+    half_filter = int(np.ceil(10 * max(up, down) / up)) + 1  # resample_poly 기본 필터의 입력 샘플 기준 반길이
+    pad = int(np.ceil(half_filter / down)) * down
+    step = max(1, chunk_size // down) * down
+    outputs = []
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        low, high = max(0, start - pad), min(n, stop + pad)
+        resampled = resample_poly(detrended[low:high], up, down, axis=0)
+        first = (start - low) * up // down
+        count = -(-stop * up // down) - start * up // down
+        outputs.append(resampled[first:first + count])
+    resampled = np.concatenate(outputs)
+    positions = np.arange(len(resampled)) * (down / up) / max(n - 1, 1)
+    return resampled + values[0] + np.multiply.outer(positions, values[-1] - values[0])
+
+def resample_polyphase(timestamps, values, target_rate, source_rate=None, tolerance=0.1,
+                       chunk_size=65536, max_denominator=1000, kind='cubic', overlap=32):
+    """
+    거의 균일한 샘플링 신호를 polyphase FIR(up/down 유리수 배율)로 target_rate에 맞춰 리샘플링.
+    FIR 필터가 안티에일리어싱을 수행하므로 낮은 레이트로 변환할 때도 정확하며,
+    누락이나 지터가 있는 구간만 스플라인 보간(Resampler)으로 채웁니다.
+
+    :param timestamps: 원본 타임스탬프 (초, 오름차순).
+    :param values: (샘플 수,) 또는 (샘플 수, 채널 수) 값 배열.
+    :param target_rate: 목표 샘플링 레이트 (Hz).
+    :param source_rate: 원본의 공칭 샘플링 레이트 (None이면 추정값을 정수 Hz로 반올림).
+    :param tolerance: 균일 구간으로 판단할 간격의 상대 편차.
+    :param chunk_size: polyphase 처리 청크의 입력 샘플 수.
+    :param max_denominator: up/down 유리수 근사의 최대 분모.
+    :param kind: 불균일 구간에 사용할 스플라인 보간 방식.
+    :param overlap: 불균일 구간 앞뒤로 스플라인 맞춤에 포함할 원본 샘플 수.
+    :return: (타임스탬프, 값, 보고서 dict). 보고서에는 추정 레이트, 지터, up/down, 처리 방식별 샘플 수가 들어있습니다.
+    """
+    timestamps = np.asarray(timestamps, dtype=float)
+    values = np.asarray(values, dtype=float)
+    sampling = estimate_sampling(timestamps, tolerance)
+    source_rate = round(sampling['rate']) if source_rate is None else source_rate
+    ratio = Fraction(target_rate).limit_denominator(max_denominator) / Fraction(source_rate).limit_denominator(max_denominator)
+    ratio = ratio.limit_denominator(max_denominator)
+    up, down = ratio.numerator, ratio.denominator
 
-        # 각 픽셀 위치에 대해 보간 수행 (높이 x 너비만큼 반복)
-        for h in range(height):
-            for w in range(width):
-                pixel_values = channel_data[:, h, w]  # 픽셀 타임라인 데이터 추출
-                interpolation_function = interp1d(timestamps, pixel_values, kind='linear', fill_value="extrapolate")
-                interpolated_channel[:, h, w] = np.clip(interpolation_function(interpolated_timestamps), 0, 255)
+    # 불규칙 간격을 경계로 균일 구간을 나눔 (구간 = 입력 인덱스 [start, stop))
+    boundaries = np.concatenate([[0], sampling['irregular'] + 1, [len(timestamps)]])
+    minimum = 4 * (int(np.ceil(10 * max(up, down) / up)) + down)  # 너무 짧은 구간은 스플라인으로 처리
+    pieces_t, pieces_v = [], []
+    polyphase_samples = 0
+    for start, stop in zip(boundaries[:-1], boundaries[1:]):
+        if stop - start < minimum:
+            continue
+        segment_values = _polyphase_segment(values[start:stop], up, down, chunk_size)
+        # 구간의 실제 시계(선형 맞춤)로 출력 샘플의 시점을 계산
+        slope, intercept = np.polyfit(np.arange(stop - start), timestamps[start:stop], 1)
+        positions = np.arange(len(segment_values)) * (down / up)
+        # 구간의 마지막 입력 샘플 뒤에 놓이는 출력은 외삽이므로 버림
+        inside = positions <= stop - start - 1
+        pieces_t.append(intercept + slope * positions[inside])
+        pieces_v.append(segment_values[inside])
+        polyphase_samples += int(inside.sum())
 
-        interpolated_frames[..., channel] = interpolated_channel
+    # polyphase로 덮지 못한 구간(누락, 지터, 짧은 구간)은 목표 간격의 스플라인 보간으로 채움
+    period = 1.0 / target_rate
+    edges = [timestamps[0] - period] + [t for piece in pieces_t for t in (piece[0], piece[-1])] + [timestamps[-1] + period]
+    filled_t, filled_v = [], []
+    spline_samples = 0
+    for index, (gap_start, gap_stop) in enumerate(zip(edges[0::2], edges[1::2])):
+        grid = np.arange(gap_start + period, gap_stop - 0.5 * period, period)
+        # 입력 범위 밖으로 외삽하지 않음
+        grid = grid[(grid >= timestamps[0]) & (grid <= timestamps[-1])]
+        if len(grid):
+            # 스플라인은 구간 주변 overlap개 샘플에만 맞춤 (전체 신호에 맞추면 긴 기록에서 비용이 큼)
+            start = max(0, int(np.searchsorted(timestamps, grid[0], side='right')) - 1 - overlap)
+            stop = min(len(timestamps), int(np.searchsorted(timestamps, grid[-1], side='left')) + 1 + overlap)
+            spline = Resampler(timestamps[start:stop], values[start:stop], kind=kind)
+            filled_t.append(grid)
+            filled_v.append(spline.resample(grid))
+            spline_samples += len(grid)
+        if index < len(pieces_t):
+            filled_t.append(pieces_t[index])
+            filled_v.append(pieces_v[index])
 
-    return interpolated_timestamps.tolist(), interpolated_frames
\ No newline at end of file
+    report = {
+        'rate': sampling['rate'],
+        'jitter': sampling['jitter'],
+        'relative_jitter': sampling['relative_jitter'],
+        'irregular_intervals': len(sampling['irregular']),
+        'source_rate': source_rate,
+        'up': up,
+        'down': down,
+        'polyphase_samples': polyphase_samples,
+        'spline_samples': spline_samples,
+    }
+    return np.concatenate(filled_t), np.concatenate(filled_v), report
@@ -1,53 +1,64 @@
+import os
 import numpy as np
-import cv2
-from skimage.metrics import peak_signal_noise_ratio as psnr
+from sync import align_nearest
+from quality import frame_quality
+import metrics
+from vidcap import FrameWriter
 
-def synchronize_nearest_frames(original_frames, original_timestamps, interpolated_frames, interpolated_timestamps):
+@metrics.timed('align')
+def synchronize_nearest_frames(original_frames, original_timestamps, interpolated_frames, interpolated_timestamps, tolerance=None):
     """
     30 FPS 원본 프레임과 500 Hz 보간된 프레임을 동기화.
-    """
-    synchronized_frames = []
-    for t in original_timestamps:
+    원본 타임스탬프마다 가장 가까운 보간 타임스탬프를 이진 탐색(sync.align_nearest)으로 찾습니다.
 
-        # 보간된 타임스탬프 중에서 원본 타임스탬프와 가장 가까운 값 선택
-        closest_idx = np.argmin(np.abs(np.array(interpolated_timestamps) - t))
-        print('original timestamp :', t)
-        print('interpolated timestamps :', interpolated_timestamps[closest_idx])
-        synchronized_frames.append(interpolated_frames[closest_idx])
+    :param tolerance: 허용 오차 (초). 이를 넘는 시점의 프레임은 None으로 채웁니다.
+    :return: 동기화된 프레임 리스트. interpolated_frames가 None이면 (인덱스, 오프셋, 일치 마스크)를 반환.
+    """
+    indices, offsets, matched = align_nearest(original_timestamps, interpolated_timestamps, tolerance)
+    metrics.count('frames', len(indices))
+    metrics.count('unmatched', int(len(matched) - np.count_nonzero(matched)))
+    if interpolated_frames is None:
+        return indices, offsets, matched
 
-    return synchronized_frames
+    return [interpolated_frames[index] if ok else None for index, ok in zip(indices, matched)]
 
-def calculate_psnr(original_frames, synchronized_frames):
+@metrics.timed('quality')
+def calculate_psnr(original_frames, synchronized_frames, chunk_size=32, workers=None):
     """
-    PSNR 계산.
+    PSNR 계산. 프레임 묶음 단위로 벡터화해 계산합니다 (quality.frame_quality).
+    프레임별 값과 요약 통계가 필요하면 quality.frame_quality를 직접 사용하세요.
+
+    :return: 유효한 프레임들의 평균 PSNR.
     """
-    psnr_values = []
-    for original, synchronized in zip(original_frames, synchronized_frames):
-        if isinstance(original, np.ndarray) and isinstance(synchronized, np.ndarray):
-            value = psnr(original, synchronized, data_range=255)
-            psnr_values.append(value)
-        else:
-            print("Invalid frame format. Skipping...")
+    quality = frame_quality(original_frames, synchronized_frames, chunk_size=chunk_size, workers=workers)
+    skipped = quality['summary']['frames'] - quality['summary']['valid']
+    metrics.count('frames', quality['summary']['frames'])
+    metrics.count('skipped', skipped)
+    if skipped:
+        print(f"Invalid frame format. Skipped {skipped} frames.")
 
+    psnr_values = quality['psnr'][~np.isnan(quality['psnr'])]
     return np.mean(psnr_values)
 
-def save_frames_to_video(frames, output_path, fps=30):
-    if not frames:
-        print("프레임 리스트가 비어 있습니다.")
-        return
-
-    # 프레임 크기 확인
-    height, width, channels = frames[0].shape
-    size = (width, height)
-
-    # VideoWriter 객체 생성
-    fourcc = cv2.VideoWriter_fourcc(*'XVID')  # AVI 코덱
-    out = cv2.VideoWriter(output_path, fourcc, fps, size)
-
-    # 프레임 추가
-    for frame in frames:
-        out.write(frame)
+def save_frames_to_video(frames, output_path, fps=30, timestamps=None, timestamp_path=None, queue_size=32):
+    """
+    프레임을 백그라운드 인코딩 스레드(vidcap.FrameWriter)로 비디오 파일에 저장합니다.
+    리스트뿐 아니라 제너레이터, VideoLoader, (n, H, W, C) 묶음을 내보내는 이터레이터도 받으며,
+    대기열에 있는 최대 queue_size개 프레임만 메모리에 둡니다.
 
-    # 자원 해제
-    out.release()
-    print(f"동영상 저장 완료: {output_path}")
+    :param frames: 프레임 시퀀스 또는 프레임 묶음 이터레이터.
+    :param output_path: 저장할 비디오 경로.
+    :param fps: 비디오 프레임 레이트.
+    :param timestamps: 프레임별 타임스탬프 (선택적). 주어지면 타임스탬프 CSV도 함께 저장.
+    :param timestamp_path: 타임스탬프 CSV 경로 (None이면 비디오 경로의 확장자를 .csv로 바꾼 경로).
+    :param queue_size: 인코딩을 기다릴 수 있는 최대 프레임 수.
+    :return: 저장한 프레임 수.
+    """
+    if timestamps is not None and timestamp_path is None:
+        timestamp_path = os.path.splitext(output_path)[0] + '.csv'
+    with FrameWriter(output_path, timestamp_path if timestamps is not None else None, fps=fps,
+                     queue_size=queue_size) as writer:
+        count = writer.write_all(frames, timestamps)
+    if count == 0:
+        print("프레임 리스트가 비어 있습니다.")
+    return count
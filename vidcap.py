@@ -1,9 +1,15 @@
 import cv2
 import time
+import queue
+import threading
+import struct
+import numpy as np
 import pandas as pd
 import os
 from datetime import datetime
 
+import metrics
+
 
 def get_directory_by_name(base_dir, custom_name):
     """Creates a directory under base_dir with the given custom name."""
@@ -13,8 +19,273 @@ def get_directory_by_name(base_dir, custom_name):
     return custom_path
 
 
-def record_video(directory, fps=30):
-    """Records a video and saves timestamps in memory. Writes timestamps to CSV after recording stops."""
+class MonotonicClock:
+    """Monotonic high-resolution clock expressed in Unix seconds.
+
+    time.time() can jump (NTP adjustments) and has coarse resolution on some platforms,
+    so timestamps are taken from time.perf_counter() and anchored to the wall clock once.
+    """
+
+    def __init__(self):
+        self.anchor_unix = time.time()
+        self.anchor_perf = time.perf_counter()
+
+    def __call__(self):
+        return self.anchor_unix + (time.perf_counter() - self.anchor_perf)
+
+
+def _capture_loop(cap, frame_queue, stop_event, clock, stats, latest, encoder):
+    """Grabs frames and timestamps them as soon as they arrive; never blocks on encoding.
+
+    encoder is the thread consuming frame_queue; it must be started before this loop.
+    """
+    index = 0
+    while not stop_event.is_set():
+        ret, frame = cap.read()
+        current_time = clock()
+        if not ret:
+            print("Error: Failed to capture frame.")
+            break
+        latest['frame'] = frame
+        try:
+            frame_queue.put_nowait((index, current_time, frame))
+            stats['captured'] += 1
+            stats['max_queue_depth'] = max(stats['max_queue_depth'], frame_queue.qsize())
+        except queue.Full:
+            # The encoder is behind; drop the frame instead of delaying the next capture.
+            stats['dropped'] += 1
+        index += 1
+    stop_event.set()
+    # Sentinel for the encoder thread. A blocking put would hang forever if the encoder
+    # died while the queue was full, so retry with a timeout only while it is alive.
+    while encoder.is_alive():
+        try:
+            frame_queue.put(None, timeout=0.1)
+            break
+        except queue.Full:
+            continue
+
+
+JOURNAL_MAGIC = b'VTSJ'
+JOURNAL_HEADER = struct.Struct('<4sId')  # magic, version, recording start time
+JOURNAL_RECORD = np.dtype([('frame', '<i8'), ('capture_index', '<i8'), ('timestamp', '<f8')])
+
+
+class TimestampJournal:
+    """Append-only binary journal of (video frame, capture index, timestamp) records.
+
+    One record is appended per encoded frame and the file is flushed to disk every
+    flush_interval seconds, so a crash loses at most that much timing information.
+    """
+
+    def __init__(self, path, start_time, flush_interval=1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.count = 0
+        self.first_timestamp = None
+        self.last_timestamp = None
+        self._file = open(path, 'wb')
+        self._file.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, 1, start_time))
+        self._last_flush = time.perf_counter()
+
+    def append(self, capture_index, timestamp):
+        self._file.write(np.array((self.count, capture_index, timestamp), dtype=JOURNAL_RECORD).tobytes())
+        if self.first_timestamp is None:
+            self.first_timestamp = timestamp
+        self.last_timestamp = timestamp
+        self.count += 1
+        if time.perf_counter() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_flush = time.perf_counter()
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+
+def read_journal(journal_path):
+    """Reads a timestamp journal, ignoring a partially written trailing record.
+
+    :return: (recording start time, structured array with 'frame', 'capture_index', 'timestamp').
+    """
+    with open(journal_path, 'rb') as file:
+        magic, _, start_time = JOURNAL_HEADER.unpack(file.read(JOURNAL_HEADER.size))
+        if magic != JOURNAL_MAGIC:
+            raise ValueError(f"Not a timestamp journal: {journal_path}")
+        data = file.read()
+    usable = len(data) - len(data) % JOURNAL_RECORD.itemsize
+    return start_time, np.frombuffer(data[:usable], dtype=JOURNAL_RECORD)
+
+
+def journal_to_csv(journal_path, csv_path, frame_count=None):
+    """Converts a timestamp journal into the CSV that VideoLoader expects.
+
+    Use it after a crash to recover the timestamps of a partial recording. Pass the number of
+    decodable frames in the AVI as frame_count to trim records for frames that never reached it.
+
+    :return: Number of timestamps written.
+    """
+    start_time, records = read_journal(journal_path)
+    if frame_count is not None:
+        records = records[:frame_count]
+    timestamp_df = pd.DataFrame({
+        'timestamp': records['timestamp'],
+        'Elapsed Time (s)': records['timestamp'] - start_time,
+        'Capture Index': records['capture_index'],
+    })
+    timestamp_df.to_csv(csv_path, index=False)
+    return len(records)
+
+
+def _encode_loop(out, frame_queue, journal):
+    """Writes queued frames to the video file in capture order and journals their timestamps."""
+    while True:
+        item = frame_queue.get()
+        if item is None:
+            break
+        capture_index, current_time, frame = item
+        out.write(frame)
+        if journal is not None:
+            journal.append(capture_index, current_time)
+
+
+class FrameWriter:
+    """Streams frames to a video file on a background encoder thread.
+
+    Frames are handed to the same encoder loop that record_video uses through a bounded queue,
+    so the producer (e.g. sync.interpolate_video) keeps computing while earlier frames are
+    encoded, and at most queue_size frames are held in memory. Per-frame timestamps go to a
+    TimestampJournal and are converted to the CSV layout that VideoLoader reads on close().
+
+        with FrameWriter('interp_V.avi', 'interp_V.csv', fps=500) as writer:
+            writer.write_all(frames, timestamps)
+    """
+
+    def __init__(self, video_path, timestamp_path=None, fps=30, fourcc='XVID', queue_size=32, flush_interval=1.0):
+        """
+        :param video_path: Output video path.
+        :param timestamp_path: Output timestamp CSV path (None writes no CSV).
+        :param fps: Frame rate stored in the container.
+        :param fourcc: Four-character codec code.
+        :param queue_size: Maximum number of frames waiting to be encoded.
+        :param flush_interval: Seconds between flushes of the timestamp journal.
+        """
+        self.video_path = video_path
+        self.timestamp_path = timestamp_path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.flush_interval = flush_interval
+        self.count = 0
+        self.max_queue_depth = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._out = None
+        self._journal = None
+        self._thread = None
+
+    def _start(self, frame, start_time):
+        height, width = frame.shape[:2]
+        self._out = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height))
+        if not self._out.isOpened():
+            raise ValueError(f"Cannot open video writer for {self.video_path} ({self.fourcc}).")
+        if self.timestamp_path is not None:
+            self._journal = TimestampJournal(self.timestamp_path + '.tsj', start_time, flush_interval=self.flush_interval)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        try:
+            with metrics.stage('encode', file=os.path.basename(self.video_path)) as stage:
+                _encode_loop(self._out, self._queue, self._journal)
+                stage.count('frames', self.count)
+        except Exception as e:
+            self.error = e
+            # Keep consuming so that a producer blocked on put() can see the error and stop.
+            while self._queue.get() is not None:
+                pass
+
+    def write(self, frame, timestamp=None):
+        """Queues one (H, W, C) uint8 frame; blocks while the queue is full.
+
+        The frame is copied, so the caller may reuse its buffer immediately.
+        :param timestamp: Frame timestamp in seconds (defaults to frame number / fps).
+        """
+        if self.error is not None:
+            raise self.error
+        frame = np.array(frame, dtype=np.uint8, copy=True, order='C')
+        timestamp = self.count / self.fps if timestamp is None else float(timestamp)
+        if self._thread is None:
+            self._start(frame, timestamp)
+        self._queue.put((self.count, timestamp, frame))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        self.count += 1
+
+    def write_chunk(self, frames, timestamps=None):
+        """Queues a (n, H, W, C) chunk of frames."""
+        for offset, frame in enumerate(frames):
+            self.write(frame, None if timestamps is None else timestamps[offset])
+
+    def write_all(self, frames, timestamps=None):
+        """Queues every frame from an iterable of frames or of (n, H, W, C) chunks.
+
+        :param timestamps: Iterable of per-frame timestamps matching the frames (optional).
+        :return: Number of frames written.
+        """
+        timestamps = iter(timestamps) if timestamps is not None else None
+        start = self.count
+        for item in frames:
+            item = np.asarray(item)
+            for frame in (item if item.ndim == 4 else (item,)):
+                self.write(frame, next(timestamps) if timestamps is not None else None)
+        return self.count - start
+
+    def close(self):
+        """Waits for queued frames to be encoded, releases the file and writes the timestamp CSV.
+
+        :return: Number of frames written.
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._out.release()
+            if self._journal is not None:
+                self._journal.close()
+                journal_to_csv(self._journal.path, self.timestamp_path)
+                os.remove(self._journal.path)
+        if self.error is not None:
+            raise self.error
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+        return False
+
+
+def record_video(directory, fps=30, preview=True, preview_fps=10, queue_size=128, duration=None,
+                 flush_interval=1.0):
+    """Records a video and journals timestamps to disk. Writes timestamps to CSV after recording stops.
+
+    Capture and encoding run on separate threads connected by a bounded queue, so XVID
+    encoding and the preview window can no longer delay cap.read() and skew the timestamps.
+    Frames are stamped with a monotonic high-resolution clock (in Unix seconds).
+
+    :param directory: Output directory for the AVI and the timestamp CSV.
+    :param fps: Requested camera frame rate.
+    :param preview: Show a preview window (press 'q' to stop).
+    :param preview_fps: Maximum preview refresh rate.
+    :param queue_size: Maximum number of captured frames waiting to be encoded.
+    :param duration: Stop automatically after this many seconds (None records until stopped).
+    :param flush_interval: Seconds between flushes of the timestamp journal.
+    :return: Dict with captured/encoded/dropped frame counts, max queue depth and achieved fps.
+    """
     cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
     if not cap.isOpened():
         print("Error: Could not open camera.")
@@ -26,42 +297,69 @@ def record_video(directory, fps=30):
 
     video_path = os.path.join(directory, 'LJY250110_V.avi')
     csv_path = os.path.join(directory, 'LJY250110_V.csv')
+    journal_path = os.path.join(directory, 'LJY250110_V.tsj')
     fourcc = cv2.VideoWriter_fourcc(*'XVID')
     out = cv2.VideoWriter(video_path, fourcc, fps, (frame_width, frame_height))
 
-    start_time = time.time()
-    timestamps = []  # 타임스탬프를 메모리에 저장
+    clock = MonotonicClock()
+    start_time = clock()
+    # 타임스탬프는 메모리에 쌓지 않고 프레임을 쓸 때마다 저널에 기록
+    journal = TimestampJournal(journal_path, start_time, flush_interval=flush_interval)
+    frame_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    stats = {'captured': 0, 'dropped': 0, 'max_queue_depth': 0}
+    latest = {'frame': None}
 
-    print("Recording... Press 'q' to stop.")
+    encode_thread = threading.Thread(target=_encode_loop, args=(out, frame_queue, journal), daemon=True)
+    capture_thread = threading.Thread(
+        target=_capture_loop, args=(cap, frame_queue, stop_event, clock, stats, latest, encode_thread), daemon=True
+    )
+    encode_thread.start()
+    capture_thread.start()
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("Error: Failed to capture frame.")
-            break
+    print("Recording... Press 'q' to stop." if preview else "Recording... Press Ctrl+C to stop.")
 
-        current_time = time.time()
-        timestamps.append(current_time)
-        out.write(frame)
+    # The preview runs on the main thread (required by HighGUI) and is throttled to preview_fps.
+    try:
+        while not stop_event.is_set():
+            if duration is not None and clock() - start_time >= duration:
+                break
+            if preview and latest['frame'] is not None:
+                cv2.imshow('Recording', latest['frame'])
+                if cv2.waitKey(max(1, int(1000 / preview_fps))) & 0xFF == ord('q'):
+                    print("Recording stopped by user.")
+                    break
+            else:
+                stop_event.wait(1.0 / preview_fps)
+    except KeyboardInterrupt:
+        print("Recording stopped by user.")
 
-        cv2.imshow('Recording', frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            print("Recording stopped by user.")
-            break
+    stop_event.set()
+    capture_thread.join()
+    encode_thread.join()
 
     cap.release()
     out.release()
-    cv2.destroyAllWindows()
+    if preview:
+        cv2.destroyAllWindows()
 
-    # 타임스탬프를 CSV로 저장
-    timestamp_df = pd.DataFrame({
-        'timestamp': timestamps,
-        'Elapsed Time (s)': [t - start_time for t in timestamps]
-    })
-    timestamp_df.to_csv(csv_path, index=False)
+    journal.close()
+
+    # 저널을 CSV로 변환
+    journal_to_csv(journal_path, csv_path)
+    os.remove(journal_path)
+
+    elapsed = journal.last_timestamp - journal.first_timestamp if journal.count > 1 else 0.0
+    stats['encoded'] = journal.count
+    stats['achieved_fps'] = (journal.count - 1) / elapsed if elapsed > 0 else 0.0
 
     print(f"Video saved to {video_path}")
     print(f"Timestamps saved to {csv_path}")
+    print(
+        f"Captured {stats['captured']} frames, encoded {stats['encoded']}, dropped {stats['dropped']}, "
+        f"max queue depth {stats['max_queue_depth']}/{queue_size}, achieved {stats['achieved_fps']:.2f} fps"
+    )
+    return stats
 
 
 if __name__ == "__main__":